@@ -0,0 +1,52 @@
+#batch.py
+
+"""Параллельный расчёт независимых проектов (зданий, файлов)
+
+Проекты распределяются по процессам ProcessPoolExecutor. Результаты
+возвращаются в порядке исходного списка, ошибка одного проекта не
+прерывает расчёт остальных.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional
+
+@dataclass
+class ProjectResult:
+    project: Any
+    value: Any = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def _run(func: Callable[[Any], Any], project: Any) -> ProjectResult:
+    try:
+        return ProjectResult(project, func(project))
+    except Exception as e:
+        return ProjectResult(project, error=str(e))
+
+def run_projects(func: Callable[[Any], Any], projects: Iterable[Any],
+                 workers: Optional[int] = None) -> List[ProjectResult]:
+    """Выполняет func для каждого проекта, по возможности в отдельных процессах
+
+    func должна быть функцией уровня модуля (или functools.partial от неё),
+    чтобы её можно было передать в дочерний процесс.
+    workers=None - по числу ядер, workers=1 - последовательно в текущем процессе.
+    """
+    projects = list(projects)
+    if workers == 1 or len(projects) <= 1:
+        return [_run(func, project) for project in projects]
+
+    # Пул процессов нужен только при параллельном запуске: его импорт заметно удлиняет старт
+    from concurrent.futures import ProcessPoolExecutor
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run, func, project) for project in projects]
+        for project, future in zip(projects, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # Сюда попадают только сбои самого процесса-исполнителя
+                results.append(ProjectResult(project, error=str(e)))
+    return results
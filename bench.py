@@ -0,0 +1,322 @@
+#bench.py
+
+"""Воспроизводимые замеры производительности расчёта без графического интерфейса
+
+Замеряются интерполяция alpha и скоростей, пакетный и поучастковый расчёт
+участков, подбор диаметров, расчёт нагрузок, импорт файлов участков и
+сохранение результатов во всех форматах. Каждый замер параметризуется
+числом участков, типом потребителя или диаметром; входные данные
+генерируются с фиксированным seed.
+Результат - JSON с пропускной способностью, процентилями задержки и
+пиковой памятью (по tracemalloc), который можно сравнить с прошлым прогоном:
+
+    python bench.py --sizes 10 1000 100000 --output bench.json
+    python bench.py --sizes 10 1000 100000 --compare bench.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import numpy as np
+import engine
+import export
+import importer
+import lookup
+from xlsxstream import XlsxStreamWriter
+
+DEFAULT_SIZES = [10, 1000, 100000]
+DEFAULT_CONSUMERS = [5.0, 12.0, 30.0]
+SEED = 2020
+
+# Поэлементные замеры (скалярная интерполяция, расчёт по участку, нагрузки)
+# ограничены этим числом вызовов: их задержка от размера проекта не зависит
+MAX_CALLS = 100000
+
+PERCENTILES = (50, 90, 99)
+
+@dataclass
+class Case:
+    """Один замер: run() выполняет size операций
+
+    per_call - run() принимает номер вызова и выполняет одну операцию;
+    задержка считается по каждому вызову, иначе - по каждому повтору run().
+    """
+    name: str
+    params: Dict[str, Any]
+    size: int
+    run: Callable
+    per_call: bool = False
+    setup: Optional[Callable[[], None]] = None
+
+@dataclass
+class Measurement:
+    name: str
+    params: Dict[str, Any]
+    size: int
+    repeats: int
+    seconds: float
+    throughput: float
+    latency_ms: Dict[str, float]
+    peak_memory_bytes: Optional[int] = None
+
+    @property
+    def key(self) -> str:
+        params = ",".join(f"{k}={v}" for k, v in sorted(self.params.items()))
+        return f"{self.name}[{params}]@{self.size}"
+
+def sections(size: int, consumers: List[float], rng: np.random.Generator):
+    """Случайные участки: t из consumers, U от 1 до 500, D из таблицы скоростей"""
+    t = rng.choice(np.asarray(consumers, dtype=float), size)
+    U = np.round(rng.uniform(1, 500, size), 1)
+    D = rng.choice(lookup.DIAMETERS, size).astype(int)
+    return t, U, D
+
+def write_sections(file_path: str, t: np.ndarray, U: np.ndarray, D: np.ndarray) -> None:
+    if file_path.endswith('.csv'):
+        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['t', 'U', 'D'])
+            writer.writerows(zip(t.tolist(), U.tolist(), D.tolist()))
+        return
+    with XlsxStreamWriter(file_path, "Участки") as writer:
+        writer.append(['t', 'U', 'D'])
+        for row in zip(t.tolist(), U.tolist(), D.tolist()):
+            writer.append(row)
+
+def _percentiles(latencies: np.ndarray) -> Dict[str, float]:
+    values = np.percentile(latencies * 1000, PERCENTILES)
+    result = {f"p{p}": float(v) for p, v in zip(PERCENTILES, values)}
+    result["max"] = float(latencies.max() * 1000)
+    return result
+
+def _time_case(case: Case, repeats: int) -> np.ndarray:
+    clock = time.perf_counter
+    if case.per_call:
+        if case.setup is not None:
+            case.setup()
+        latencies = np.empty(case.size)
+        run = case.run
+        for i in range(case.size):
+            start = clock()
+            run(i)
+            latencies[i] = clock() - start
+        return latencies
+    latencies = np.empty(repeats)
+    for i in range(repeats):
+        if case.setup is not None:
+            case.setup()
+        start = clock()
+        case.run()
+        latencies[i] = clock() - start
+    return latencies
+
+def _peak_memory(case: Case) -> int:
+    """Пик памяти, выделенной за один прогон (Python и NumPy)"""
+    if case.setup is not None:
+        case.setup()
+    tracemalloc.start()
+    try:
+        if case.per_call:
+            for i in range(case.size):
+                case.run(i)
+        else:
+            case.run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def measure(case: Case, repeats: int, memory: bool = True) -> Measurement:
+    latencies = _time_case(case, repeats)
+    if case.per_call:
+        seconds = float(latencies.sum())
+        repeats = 1
+    else:
+        seconds = float(np.median(latencies))
+    return Measurement(
+        name=case.name, params=case.params, size=case.size, repeats=repeats,
+        seconds=seconds, throughput=case.size / seconds if seconds > 0 else float('inf'),
+        latency_ms=_percentiles(latencies),
+        peak_memory_bytes=_peak_memory(case) if memory else None
+    )
+
+def interpolation_cases(size: int, diameters: List[int], rng: np.random.Generator) -> Iterator[Case]:
+    x = rng.uniform(0.01, 50, size)
+    x_list = x[:MAX_CALLS].tolist()
+    calls = len(x_list)
+    yield Case("alpha_scalar", {}, calls, lambda i: lookup.ALPHA_TABLE.scalar(x_list[i]), per_call=True)
+    yield Case("alpha_cached", {}, calls, lambda i: engine.interpolate_alpha(x_list[i]), per_call=True,
+               setup=lookup.ALPHA_CACHE.invalidate)
+    yield Case("alpha_array", {}, size, partial(engine.interpolate_alpha_array, x))
+
+    Q = rng.uniform(0.05, 5, size)
+    Q_list = Q[:MAX_CALLS].tolist()
+    for D in diameters:
+        D_column = np.full(size, D)
+        yield Case("velocity_scalar", {"D": D}, calls, lambda i, D=D: engine.interpolate_velocity(Q_list[i], D),
+                   per_call=True)
+        yield Case("velocity_array", {"D": D}, size, partial(engine.interpolate_velocity_array, Q, D_column))
+
+def section_cases(size: int, consumers: List[float], rng: np.random.Generator) -> Iterator[Case]:
+    for t in consumers:
+        _, U, D = sections(size, consumers, rng)
+        t_column = np.full(size, t)
+        yield Case("sections_batch", {"t": t}, size,
+                   partial(engine.calculate_streams_batch, U, D, t_column))
+        yield Case("sections_cold", {"t": t}, size,
+                   partial(engine.calculate_sections_batch, U, D, t_column, "cold"))
+        yield Case("diameter_select", {"t": t}, size,
+                   partial(engine.select_diameters, U, t_column, ("cold", "hot")))
+
+        calls = min(size, MAX_CALLS)
+        params = engine.get_consumer_params(t, "cold")[1]
+        U_list, D_list = U[:calls].tolist(), D[:calls].tolist()
+        yield Case("section_scalar", {"t": t}, calls,
+                   lambda i, t=t, U=U_list, D=D_list, params=params: engine.calculate_section(t, U[i], D[i], *params),
+                   per_call=True)
+
+def load_cases(size: int, consumers: List[float], rng: np.random.Generator) -> Iterator[Case]:
+    calls = min(size, MAX_CALLS)
+    for t in consumers:
+        consumer_data = engine.build_consumer_data(t)
+        U_list = rng.uniform(1, 5000, calls).tolist()
+        yield Case("load", {"t": t}, calls,
+                   lambda i, consumer_data=consumer_data, U=U_list: engine.calculate_load(consumer_data, U[i]),
+                   per_call=True)
+
+def import_cases(size: int, consumers: List[float], rng: np.random.Generator, directory: str) -> Iterator[Case]:
+    t, U, D = sections(size, consumers, rng)
+    for extension in ('csv', 'xlsx'):
+        file_path = os.path.join(directory, f"sections_{size}.{extension}")
+        write_sections(file_path, t, U, D)
+        yield Case("import", {"format": extension}, size, partial(importer.read_store, file_path))
+
+def export_cases(size: int, consumers: List[float], rng: np.random.Generator, directory: str,
+                 formats: List[str]) -> Iterator[Case]:
+    t, U, D = sections(size, consumers, rng)
+    results = engine.calculate_sections_batch(U, D, t, "cold").to_results()
+    headers = export.RESULT_HEADERS["cold"]
+    for extension in formats:
+        file_path = os.path.join(directory, f"results_{size}.{extension}")
+        yield Case("export", {"format": extension}, size,
+                   partial(export.save_sections, file_path, results, headers, "Бенчмарк"))
+
+GROUPS = ["interpolation", "sections", "load", "import", "export"]
+
+def build_cases(group: str, size: int, consumers: List[float], diameters: List[int],
+                formats: List[str], directory: str) -> Iterator[Case]:
+    # Свой генератор для каждой группы и размера: набор групп не влияет на входные данные
+    rng = np.random.default_rng([SEED, GROUPS.index(group), size])
+    if group == "interpolation":
+        return interpolation_cases(size, diameters, rng)
+    if group == "sections":
+        return section_cases(size, consumers, rng)
+    if group == "load":
+        return load_cases(size, consumers, rng)
+    if group == "import":
+        return import_cases(size, consumers, rng, directory)
+    return export_cases(size, consumers, rng, directory, formats)
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment() -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "tables": lookup.LOAD_INFO.source,
+    }
+
+def run(sizes: List[int], groups: List[str], consumers: List[float], diameters: List[int],
+        formats: List[str], repeats: int = 5, memory: bool = True, log=None) -> Dict[str, Any]:
+    """Выполняет замеры и возвращает отчёт в виде словаря для JSON"""
+    measurements = []
+    with tempfile.TemporaryDirectory(prefix="bench.") as directory:
+        for size in sizes:
+            for group in groups:
+                for case in build_cases(group, size, consumers, diameters, formats, directory):
+                    result = measure(case, repeats, memory)
+                    measurements.append(result)
+                    if log is not None:
+                        print(f"{result.key}: {result.throughput:,.0f} оп/с, "
+                              f"p50 {result.latency_ms['p50']:.3f} мс", file=log)
+    return {
+        "environment": environment(),
+        "settings": {"sizes": sizes, "groups": groups, "consumers": consumers,
+                     "diameters": diameters, "formats": formats, "repeats": repeats, "seed": SEED},
+        "results": [dict(vars(m), key=m.key) for m in measurements],
+    }
+
+def compare(base: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Замеры, в которых медианное время выросло больше чем в (1 + threshold) раз"""
+    base_results = {item["key"]: item for item in base["results"]}
+    regressions = []
+    for item in current["results"]:
+        old = base_results.get(item["key"])
+        if old is None or old["seconds"] <= 0:
+            continue
+        ratio = item["seconds"] / old["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{item['key']}: {old['seconds']:.6f} с -> {item['seconds']:.6f} с (x{ratio:.2f})")
+    return regressions
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Замеры производительности расчёта по СП 30.13330.2020")
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES,
+                        help="Число участков (например 10 1000 100000 1000000)")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=GROUPS, help="Группы замеров")
+    parser.add_argument("--consumers", nargs="+", type=float, default=DEFAULT_CONSUMERS,
+                        help="Типы потребителей t")
+    parser.add_argument("--diameters", nargs="+", type=int, default=[int(D) for D in lookup.DIAMETERS],
+                        help="Диаметры для замеров интерполяции скоростей")
+    parser.add_argument("--formats", nargs="+", choices=export.FORMATS, default=export.FORMATS,
+                        help="Форматы сохранения результатов")
+    parser.add_argument("--repeats", type=int, default=5, help="Повторов пакетных замеров (берётся медиана)")
+    parser.add_argument("--no-memory", action="store_true", help="Не измерять пиковую память (вдвое быстрее)")
+    parser.add_argument("--output", help="Файл JSON для отчёта (по умолчанию - стандартный вывод)")
+    parser.add_argument("--compare", help="Отчёт прошлого прогона: вывести замеры, ставшие медленнее")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Допустимое замедление при сравнении (0.2 - на 20%%)")
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    report = run(args.sizes, args.groups, args.consumers, args.diameters, args.formats,
+                 args.repeats, not args.no_memory, log=sys.stderr)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for line in regressions:
+            print(f"Замедление: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
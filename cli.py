@@ -0,0 +1,191 @@
+#cli.py
+
+"""Пакетный расчёт участков из файлов Excel/CSV без графического интерфейса
+
+Пример:
+    python cli.py дом1.xlsx дом2.csv --system cold --format xlsx docx --output-dir results
+    python cli.py квартал/*.xlsx --format csv --workers 0
+    python cli.py дом1.xlsx --auto-diameter --v-max 1.2
+"""
+
+import time
+_START = time.perf_counter()
+
+import argparse
+import os
+import sys
+from contextlib import ExitStack
+from functools import partial
+from typing import Iterable, Iterator, List, Optional
+import batch
+import engine
+import export
+import importer
+import lookup
+from profiling import PROFILER
+
+# Время импорта модулей расчёта, включая загрузку справочных таблиц
+IMPORT_SECONDS = time.perf_counter() - _START
+
+def output_path(input_path: str, system: str, fmt: str, output_dir: Optional[str]) -> str:
+    directory = output_dir if output_dir else os.path.dirname(os.path.abspath(input_path))
+    name = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(directory, f"{name}_{system}.{fmt}")
+
+def iter_result_chunks(input_path: str, system: str, chunk_size: int = importer.CHUNK_SIZE,
+                       limits: Optional[engine.VelocityLimits] = None) -> Iterator[List[engine.CalculationResult]]:
+    """Потоковый расчёт участков файла: чтение, расчёт и выдача результатов порциями
+
+    Пакетный расчёт проверяет потребителей порции, поэтому неизвестный или
+    нерасчётный для потока t отклоняется до того, как порция будет записана.
+    Если заданы limits, диаметры из файла заменяются подобранными по скорости.
+    """
+    offset = 0
+    for t, U, D in importer.iter_section_chunks(importer.iter_sections(input_path), chunk_size):
+        if limits is not None:
+            D = engine.select_diameters(U, t, (system,), limits, offset)
+        offset += len(U)
+        yield engine.calculate_sections_batch(U, D, t, system).to_results()
+
+def calculate_load_file(input_path: str, U_total: Optional[float] = None,
+                        t_h: float = 60, t_c: float = 5, T: float = 24) -> List[engine.LoadResult]:
+    consumers = set()
+    U_max = None
+    for item in importer.iter_sections(input_path):
+        consumers.add(item['t'])
+        U_max = item['U'] if U_max is None else max(U_max, item['U'])
+    if not consumers:
+        raise ValueError(f"В файле нет участков для расчёта: {input_path}")
+    if len(consumers) > 1:
+        raise ValueError(f"Для расчёта нагрузок файл должен содержать одного потребителя: {input_path}")
+    # На вводе участок несёт все приборы здания, поэтому по умолчанию берётся наибольшее U
+    U = U_total if U_total is not None else U_max
+    consumer_data = engine.build_consumer_data(consumers.pop())
+    return engine.calculate_load(consumer_data, U, t_h, t_c, T)
+
+def save_sections_files(input_path: str, system: str, file_paths: List[str],
+                        limits: Optional[engine.VelocityLimits] = None) -> None:
+    """Один проход расчёта по файлу: каждая порция результатов пишется во все форматы сразу
+
+    Файлы пишутся через export.atomic_output, поэтому при ошибке в любой
+    порции ни один из них не остаётся недописанным.
+    """
+    headers = export.RESULT_HEADERS[system]
+    with ExitStack() as stack:
+        writers = []
+        for file_path in file_paths:
+            temp_path = stack.enter_context(export.atomic_output(file_path))
+            writers.append(stack.enter_context(export.section_writer(temp_path, headers)))
+        written = 0
+        for results in iter_result_chunks(input_path, system, limits=limits):
+            with PROFILER.stage("export"):
+                for writer in writers:
+                    writer.write(results)
+            written += len(results)
+        if not written:
+            raise ValueError(f"В файле нет участков для расчёта: {input_path}")
+
+def workers_count(value: str) -> int:
+    """Тип аргумента --workers: целое число не меньше 0"""
+    try:
+        workers = int(value)
+    except ValueError:
+        workers = -1
+    if workers < 0:
+        raise argparse.ArgumentTypeError(f"ожидается целое число не меньше 0: {value}")
+    return workers
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Гидравлический расчёт по СП 30.13330.2020 без графического интерфейса"
+    )
+    parser.add_argument("inputs", nargs="+", help="Файлы .xlsx или .csv с колонками t, U, D")
+    parser.add_argument("--system", choices=list(engine.SYSTEMS) + ["load"], default="cold",
+                        help="cold - ХВС, hot - ГВС, total - общий расход, load - расчёт нагрузок")
+    parser.add_argument("--format", nargs="+", choices=export.FORMATS, default=["csv"], dest="formats",
+                        help="Форматы файлов результатов")
+    parser.add_argument("--output-dir", help="Каталог для результатов (по умолчанию - рядом с исходным файлом)")
+    parser.add_argument("--U", type=float, dest="U_total",
+                        help="Общее число приборов для расчёта нагрузок (по умолчанию - наибольшее U в файле)")
+    parser.add_argument("--t-h", type=float, default=60, help="Температура горячей воды, oC")
+    parser.add_argument("--t-c", type=float, default=5, help="Температура холодной воды, oC")
+    parser.add_argument("--T", type=float, default=24, help="Период водопотребления, ч")
+    parser.add_argument("--workers", type=workers_count, default=1,
+                        help="Число процессов для параллельной обработки файлов (0 - по числу ядер)")
+    parser.add_argument("--timing", action="store_true",
+                        help="Вывести время запуска и загрузки справочных таблиц")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Сохранить время этапов расчёта: .json - словарь, иначе текстовая сводка")
+    parser.add_argument("--cprofile", metavar="FILE",
+                        help="Дополнительно собрать cProfile и сохранить его в FILE (.prof)")
+    limits = engine.VelocityLimits()
+    parser.add_argument("--auto-diameter", action="store_true",
+                        help="Подобрать каждому участку наименьший диаметр со скоростью в пределах --v-min..--v-max")
+    parser.add_argument("--v-min", type=float, default=limits.v_min, help="Наименьшая скорость при подборе, м/с")
+    parser.add_argument("--v-max", type=float, default=limits.v_max, help="Наибольшая скорость при подборе, м/с")
+    return parser
+
+def process_file(input_path: str, system: str = "cold", formats: Iterable[str] = ("csv",),
+                 output_dir: Optional[str] = None, U_total: Optional[float] = None,
+                 t_h: float = 60, t_c: float = 5, T: float = 24,
+                 limits: Optional[engine.VelocityLimits] = None) -> List[str]:
+    """Расчёт одного файла и сохранение результатов; возвращает пути сохранённых файлов"""
+    saved = [output_path(input_path, system, fmt, output_dir) for fmt in dict.fromkeys(formats)]
+    if system != "load":
+        save_sections_files(input_path, system, saved, limits)
+        return saved
+
+    results = calculate_load_file(input_path, U_total, t_h, t_c, T)
+    for file_path in saved:
+        with export.atomic_output(file_path) as temp_path:
+            export.save_load(temp_path, export.load_rows(results))
+    return saved
+
+def report_startup() -> None:
+    table_load = lookup.LOAD_INFO
+    print(
+        f"Запуск: импорт модулей {IMPORT_SECONDS * 1000:.1f} мс, "
+        f"из них таблицы ({table_load.source}) {table_load.seconds * 1000:.1f} мс",
+        file=sys.stderr
+    )
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.timing:
+        report_startup()
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    task = partial(
+        process_file, system=args.system, formats=args.formats, output_dir=args.output_dir,
+        U_total=args.U_total, t_h=args.t_h, t_c=args.t_c, T=args.T,
+        limits=engine.VelocityLimits(args.v_min, args.v_max) if args.auto_diameter else None
+    )
+    workers = args.workers or None
+    profiling = bool(args.profile or args.cprofile)
+    if profiling:
+        # Таймеры собираются в текущем процессе, поэтому файлы обрабатываются последовательно
+        workers = 1
+        PROFILER.enable(cprofile=bool(args.cprofile))
+
+    failed = 0
+    for result in batch.run_projects(task, args.inputs, workers):
+        if result.ok:
+            for file_path in result.value:
+                print(f"Файл успешно сохранён: {file_path}")
+        else:
+            failed += 1
+            print(f"Ошибка при обработке {result.project}: {result.error}", file=sys.stderr)
+
+    if profiling:
+        PROFILER.disable()
+        if args.profile:
+            PROFILER.dump(args.profile)
+        if args.cprofile:
+            PROFILER.dump(args.cprofile)
+        print(PROFILER.summary() if args.profile is None else f"Профиль сохранён: {args.profile}", file=sys.stderr)
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
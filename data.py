@@ -43,7 +43,7 @@ q_c_values = np.array([70.0, 110.0, 120.0, 80.0, 95.0, 110.0, 40.0, 60.0, 50.0,
                       8.6, 12.0, 39.0, 20.0, 65.0, 53.7, 27.2, 7.5, 12.2, 125.0,
                       7.5, 9.1, 6.3, 40.0, 8.0, 263.0, 8.6, 7.4, 195.0, 8.0,
                       28.0, 2.7, 6.4, 6.0, 19.0, 2.15, 25.0, 49.0, 10.0, 2.15,
-                      49.0, 0.0, 20.0, 160.0, 60.0, 240.0, 270.0, 24.6, 15.6, 3.0,
+                      49.0, 80.0, 130.0, 160.0, 240.0, 270.0, 24.6, 15.6, 3.0,
                       0.5, 1.5, 0.45, 4.5, 0.5])
 
 q_tot_0_values = np.array([0.2, 0.3, 0.3, 0.2, 0.3, 0.3, 0.2, 0.2, 0.2, 0.3, 0.2, 
@@ -58,14 +58,14 @@ q_h_0_values = np.array([0.2, 0.3, 0.3, 0.14, 0.2, 0.2, 0.14, 0.14, 0.14,
 						0.14, 0.1, 0.14, 0.1, 0.14, 0.2, 0.2, 0.1, 0.1, 0.2, 0.1, 0.1, 
 						0.1, 0.1, 0.1, 0.2, 0.2, 0.2, 0.2, 0.1, 0.1, 0.1, 0.1, 0.1, 
 						0.1, 0.1, 0.14, 0.14, 0, 0.1, 0.14, 0.4, 0.4, 0.14, 0.2, 0.14, 
-						0.1, 0.1, 0, 0, 0, 0, 0])
+						0.1, 0.1, 0, 0, 0, 0, 0, 0])
 
 q_c_0_values = np.array([0.2, 0.3, 0.3, 0.14, 0.2, 0.2, 0.14, 0.14, 0.14, 
 						0.2, 0.14, 0.2, 0.2, 0.2, 0.14, 0.2, 0.14, 0.14, 0.14, 0.2, 
 						0.14, 0.1, 0.14, 0.1, 0.14, 0.2, 0.2, 0.1, 0.1, 0.2, 0.1, 0.1, 
 						0.1, 0.1, 0.1, 0.2, 0.2, 0.2, 0.2, 0.1, 0.1, 0.1, 0.1, 0.1, 
 						0.1, 0.1, 0.14, 0.14, 0, 0.1, 0.14, 0.4, 0.4, 0.14, 0.2, 0.14, 
-						0.1, 0.1, 0, 0, 0, 0, 0])
+						0.1, 0.1, 0, 0, 0, 0, 0, 0])
 
 q_tot_0_hr_values = np.array([50, 300, 300, 100, 300, 300, 100, 100, 100, 300, 
                               115, 250, 280, 300, 100, 300, 200, 100, 100, 300, 
@@ -340,6 +340,6 @@ __all__ = ['t_values',
 		   'q_tot_0_values', 'q_h_0_values', 'q_c_0_values',
            'q_tot_0_hr_values', 'q_h_0_hr_values', 'q_c_0_hr_values',
            't_num_values', 't_string_values',
-           'diam_values', 'q_values', 'v_16_values', 'v_20_values', 
+           'diam_values', 'q_values', 'v_20_values', 
            'v_25_values', 'v_32_values', 'v_40_values', 'v_50_values', 'v_63_values', 
-           'v_75_values', 'v_90_values', 'v_110_values', 'x_values', 'y_values', 'q_dict', 'v_dict']
\ No newline at end of file
+           'v_75_values', 'v_90_values', 'v_110_values', 'x_values', 'y_values', 'v_dict']
\ No newline at end of file
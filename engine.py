@@ -0,0 +1,401 @@
+#engine.py
+
+import numpy as np
+import lookup
+from profiling import PROFILER
+from typing import List, Tuple, Dict, Any, Iterable, Optional
+from dataclasses import dataclass
+
+@dataclass
+class CalculationResult:
+    t: float
+    U: float
+    D: int
+    q_chru: float
+    q_c0: float
+    group: int
+    consumer: str
+    PcN: float
+    alpha: float
+    Q: float
+    velocity: float
+
+@dataclass
+class SectionBatch:
+    """Результаты пакетного расчёта участков (по одному элементу массива на участок)"""
+    t: np.ndarray
+    U: np.ndarray
+    D: np.ndarray
+    q_hru: np.ndarray
+    q_0: np.ndarray
+    index: np.ndarray
+    PcN: np.ndarray
+    alpha: np.ndarray
+    Q: np.ndarray
+    velocity: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.U)
+
+    def to_results(self) -> List[CalculationResult]:
+        """Преобразует массивы в список CalculationResult, как при поучастковом расчёте"""
+        t_num = lookup.CONSUMERS.column('group')[self.index]
+        t_string = lookup.CONSUMERS.column('name')[self.index]
+        if np.any(self.index < 0):
+            # Участки сети со смешанными потребителями (см. network.py) или без потребителей
+            unknown = self.index < 0
+            t_num = np.where(unknown, "", t_num)
+            t_string = np.where(unknown, np.where(self.U > 0, TEXT["mixed_consumers"], ""), t_string)
+        return [
+            CalculationResult(
+                t=self.t[i], U=self.U[i], D=int(self.D[i]),
+                q_chru=self.q_hru[i], q_c0=self.q_0[i],
+                group=t_num[i], consumer=t_string[i], PcN=self.PcN[i],
+                alpha=self.alpha[i], Q=self.Q[i], velocity=self.velocity[i]
+            )
+            for i in range(len(self))
+        ]
+
+@dataclass(frozen=True)
+class VelocityLimits:
+    """Допустимая скорость воды при подборе диаметров, м/с"""
+    v_min: float = 0.0
+    v_max: float = 1.5  # наибольшая скорость во внутренних сетях, СП 30.13330.2020
+
+@dataclass
+class LoadResult:
+    parameter: str
+    value: float
+    unit: str
+    name: str = ""  # имя величины в LOAD_FORMULAS (q_c, Q_day_h...)
+
+TEXT = {
+    "t_not_found": "Значение t={} не найдено в массиве.",
+    "unknown_system": "Неизвестный тип системы: {}",
+    "section_error": "Ошибка в расчётах участка: {}",
+    "interpolation_error": "Не удалось выполнить интерполяцию.",
+    "velocity_error": "Не удалось вычислить значение скорости.",
+    "diameter_not_found": "Диаметр D={} отсутствует в таблице скоростей.",
+    "mixed_consumers": "Несколько потребителей",
+    "invalid_limits": "Некорректные пределы скорости: {} - {} м/с",
+    "no_diameter": "Участок №{}: ни один диаметр не даёт скорость в пределах {} - {} м/с"
+}
+
+# Тип системы -> префикс параметров потока в data.py
+SYSTEMS = {
+    "cold": "c",
+    "hot": "h",
+    "total": "tot",
+}
+
+CONSUMER_KEYS = [
+    'q_tot_hru', 'q_h_hru', 'q_c_hru',
+    'q_tot', 'q_h', 'q_c',
+    'q_tot_0', 'q_h_0', 'q_c_0',
+    'q_tot_0_hr', 'q_h_0_hr', 'q_c_0_hr'
+]
+
+def interpolate_alpha(x: float) -> float:
+    """Альфа по таблице Б.1 СП 30 для значения P*N"""
+    return lookup.ALPHA_CACHE(x)
+
+def interpolate_alpha_array(x: np.ndarray) -> np.ndarray:
+    return lookup.ALPHA_TABLE.array(x)
+
+def diameter_rows(D: np.ndarray) -> np.ndarray:
+    """Номера строк VELOCITY_TABLE для массива диаметров"""
+    D = np.asarray(D)
+    rows = np.clip(np.searchsorted(lookup.DIAMETERS, D), 0, len(lookup.DIAMETERS) - 1)
+    missing = lookup.DIAMETERS[rows] != D
+    if np.any(missing):
+        raise ValueError(TEXT["diameter_not_found"].format(D[missing][0]))
+    return rows
+
+def interpolate_velocity(Q: float, D: int) -> float:
+    """Скорость в трубе диаметром D при расходе Q"""
+    if D not in lookup.DIAMETER_ROWS:
+        raise ValueError(TEXT["diameter_not_found"].format(D))
+    try:
+        return lookup.VELOCITY_TABLE.scalar(Q, lookup.DIAMETER_ROWS[D])
+    except ValueError:
+        raise ValueError(TEXT["velocity_error"])
+
+def interpolate_velocity_array(Q: np.ndarray, D: np.ndarray) -> np.ndarray:
+    """Векторный аналог interpolate_velocity для массивов расходов и диаметров"""
+    rows = diameter_rows(D)
+    try:
+        return lookup.VELOCITY_TABLE.array(Q, rows)
+    except ValueError:
+        raise ValueError(TEXT["velocity_error"])
+
+def velocity_matrix(Q: np.ndarray) -> np.ndarray:
+    """Скорости при расходах Q во всех диаметрах сразу
+
+    Первая ось результата - диаметр (строка i - DIAMETERS[i]), остальные - форма Q.
+    Значения совпадают с interpolate_velocity_array для каждого диаметра.
+    """
+    try:
+        return lookup.VELOCITY_TABLE.array(Q)
+    except ValueError:
+        raise ValueError(TEXT["velocity_error"])
+
+def stream_of(system: str) -> str:
+    try:
+        return SYSTEMS[system]
+    except KeyError:
+        raise ValueError(TEXT["unknown_system"].format(system))
+
+def find_consumer(t: float) -> int:
+    """Индекс потребителя t в таблице норм"""
+    return lookup.CONSUMERS.row(t)
+
+def get_consumer_params(t: float, system: str = "cold") -> Tuple[int, Tuple[float, float, str, str]]:
+    stream = stream_of(system)
+    index = find_consumer(t)
+    lookup.CONSUMERS.check_calculable(index, stream)
+    record = lookup.CONSUMERS.records[index]
+    return index, (record[f'q_{stream}_hru'], record[f'q_{stream}_0'], record['group'], record['name'])
+
+def build_consumer_data(t: float, system: str = "cold") -> Dict[str, Any]:
+    """Все нормы потребителя t, необходимые для расчёта нагрузок"""
+    index, params = get_consumer_params(t, system)
+    # Нагрузки считаются сразу для общего, горячего и холодного потоков
+    for stream in SYSTEMS.values():
+        lookup.CONSUMERS.check_calculable(index, stream)
+    record = lookup.CONSUMERS.records[index]
+    consumer_data = {
+        't_input': t,
+        'index': index,
+        'params': params,
+    }
+    for key in CONSUMER_KEYS:
+        consumer_data[key] = record[key]
+    consumer_data['consumer_name'] = params[3]
+    return consumer_data
+
+def calculate_section(t: float, U: float, D: int, q_hru: float, q_0: float,
+                      t_num: str, t_string: str) -> CalculationResult:
+    try:
+        x_input = (q_hru * U) / (3600 * q_0)
+        alpha = interpolate_alpha(x_input)
+        Q = 5 * q_0 * alpha
+        velocity = interpolate_velocity(Q, D)
+
+        return CalculationResult(
+            t=t, U=U, D=D, q_chru=q_hru, q_c0=q_0,
+            group=t_num, consumer=t_string, PcN=x_input,
+            alpha=alpha, Q=Q, velocity=velocity
+        )
+    except ValueError as e:
+        raise ValueError(TEXT["section_error"].format(str(e)))
+
+def find_consumers(t: np.ndarray) -> np.ndarray:
+    """Индексы потребителей для массива номеров t"""
+    return lookup.CONSUMERS.find_rows(t)
+
+def calculate_streams_batch(U: np.ndarray, D: np.ndarray, t: np.ndarray,
+                            systems: Iterable[str] = tuple(SYSTEMS)) -> Dict[str, SectionBatch]:
+    """Пакетный расчёт одних и тех же участков сразу для нескольких потоков (ХВС, ГВС, общий)
+
+    Поиск потребителей и строк таблицы скоростей выполняется один раз для всех
+    потоков, а P*N, alpha, Q и скорости всех потоков считаются одним векторным
+    проходом по матрицам (поток x участок) с общими таблицами интерполяции.
+    Результаты совпадают с calculate_sections_batch для каждого потока.
+    """
+    systems = list(systems)
+    U, D, t = np.broadcast_arrays(np.asarray(U, dtype=float), np.asarray(D), np.asarray(t))
+    PROFILER.count("sections", len(U) * len(systems))
+    index, q_hru, q_0, x_input, alpha, Q = _stream_flows(U, t, systems)
+
+    try:
+        with PROFILER.stage("velocity_lookup"):
+            rows = diameter_rows(D)
+            try:
+                velocity = lookup.VELOCITY_TABLE.array(Q, rows)
+            except ValueError:
+                raise ValueError(TEXT["velocity_error"])
+    except ValueError as e:
+        raise ValueError(TEXT["section_error"].format(str(e)))
+
+    return {
+        system: SectionBatch(
+            t=t, U=U, D=D, q_hru=q_hru[k], q_0=q_0[k], index=index,
+            PcN=x_input[k], alpha=alpha[k], Q=Q[k], velocity=velocity[k]
+        )
+        for k, system in enumerate(systems)
+    }
+
+def _stream_flows(U: np.ndarray, t: np.ndarray, systems: List[str]) -> Tuple[np.ndarray, ...]:
+    """Номера потребителей, нормы, P*N, alpha и Q участков по матрицам (поток x участок)"""
+    streams = [stream_of(system) for system in systems]
+    with PROFILER.stage("consumer_lookup"):
+        # Участки группируются по типу потребителя: нормы каждой группы выбираются один раз,
+        # затем раздаются участкам группы
+        types, group = np.unique(t, return_inverse=True)
+        type_index = find_consumers(types)
+        # Нерасчётные потребители отклоняются до вычислений
+        for stream in streams:
+            lookup.CONSUMERS.check_calculable(type_index, stream)
+        index = type_index[group]
+        consumers = lookup.CONSUMERS.records[type_index]
+        q_hru = np.array([consumers[f"q_{stream}_hru"][group] for stream in streams], dtype=float)
+        q_0 = np.array([consumers[f"q_{stream}_0"][group] for stream in streams], dtype=float)
+
+    try:
+        with PROFILER.stage("alpha_lookup"):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_input = (q_hru * U) / (3600 * q_0)
+            alpha = interpolate_alpha_array(x_input)
+            Q = 5 * q_0 * alpha
+    except ValueError as e:
+        raise ValueError(TEXT["section_error"].format(str(e)))
+    return index, q_hru, q_0, x_input, alpha, Q
+
+def select_diameters(U: np.ndarray, t: np.ndarray, systems: Iterable[str] = ("cold",),
+                     limits: Optional[VelocityLimits] = None, offset: int = 0) -> np.ndarray:
+    """Наименьший диаметр каждого участка, при котором скорость в пределах limits
+
+    Скорости всех участков во всех диаметрах считаются одной матрицей
+    (диаметр x поток x участок); при нескольких потоках диаметр подходит,
+    если скорость в пределах для каждого из них. offset - число участков
+    списка перед первым из U (при расчёте порциями), для номера в сообщении.
+    По умолчанию limits - VelocityLimits().
+    """
+    if limits is None:
+        limits = VelocityLimits()
+    if not 0 <= limits.v_min < limits.v_max:
+        raise ValueError(TEXT["invalid_limits"].format(limits.v_min, limits.v_max))
+    systems = list(systems)
+    U, t = np.broadcast_arrays(np.asarray(U, dtype=float), np.asarray(t))
+    Q = _stream_flows(U, t, systems)[-1]
+
+    with PROFILER.stage("diameter_selection"):
+        candidates = np.flatnonzero(lookup.DIAMETERS > 0)
+        velocity = velocity_matrix(Q)[candidates]
+        fits = np.all((velocity >= limits.v_min) & (velocity <= limits.v_max), axis=1)
+        found = fits.any(axis=0)
+        if not np.all(found):
+            position = int(np.argmin(found))
+            raise ValueError(TEXT["no_diameter"].format(offset + position + 1, limits.v_min, limits.v_max))
+        # Диаметры упорядочены по возрастанию: первый подходящий - наименьший
+        return lookup.DIAMETERS[candidates[np.argmax(fits, axis=0)]]
+
+def calculate_sections_batch(U: np.ndarray, D: np.ndarray, t: np.ndarray,
+                             system: str = "cold") -> SectionBatch:
+    """Пакетный расчёт участков: P*N, alpha, Q и скорость за один векторный проход
+
+    U, D и t - массивы одной длины (t и D могут быть скалярами), так что в одном
+    расчёте могут быть участки разных потребителей (жильё, магазины, поликлиника).
+    Результаты совпадают с calculate_section для каждого участка.
+    """
+    return calculate_streams_batch(U, D, t, (system,))[system]
+
+#секундная альфа
+def calculate_alpha(q_hru: float, q_0: float, U: float) -> float:
+    x = (q_hru * U) / (3600 * q_0)
+    return interpolate_alpha(x)
+
+#часовая альфа
+def calculate_alpha_h(q_hru: float, q_0: float, U: float) -> float:
+    x = (q_hru * U) / (q_0)
+    return interpolate_alpha(x)
+
+# Формулы нагрузок: имя величины -> функция от LoadCalculation.
+# Зависимости запрашиваются через calc[...] и вычисляются не более одного раза.
+LOAD_FORMULAS = {}
+
+for _s in ('tot', 'h', 'c'):
+    LOAD_FORMULAS.update({
+        # секундные величины
+        f'PN_{_s}': lambda calc, s=_s: (calc.cd[f'q_{s}_hru'] * calc.U) / (3600 * calc.cd[f'q_{s}_0']),
+        f'alpha_{_s}': lambda calc, s=_s: interpolate_alpha(calc[f'PN_{s}']),
+        f'q_{_s}': lambda calc, s=_s: 5 * calc.cd[f'q_{s}_0'] * calc[f'alpha_{s}'],
+        # часовые величины
+        f'PN_hr_{_s}': lambda calc, s=_s: calc.cd[f'q_{s}_hru'] * calc.U / calc.cd[f'q_{s}_0_hr'],
+        f'alpha_hr_{_s}': lambda calc, s=_s: interpolate_alpha(calc[f'PN_hr_{s}']),
+        f'q_hr_{_s}': lambda calc, s=_s: 0.005 * calc.cd[f'q_{s}_0_hr'] * calc[f'alpha_hr_{s}'],
+        # суточный расход
+        f'Q_day_{_s}': lambda calc, s=_s: calc.cd[f'q_{s}'] * calc.U / 1000,
+    })
+
+LOAD_FORMULAS.update({
+    #Q(h,hr) = 1,16 × q(h,hr) × (t(h) – t(с)) + Q(ht)
+    'Q_heat_max': lambda calc: 1.16 * calc['q_hr_h'] * (calc.t_h - calc.t_c) + 0.4 * calc['q_hr_h'],
+    'Q_heat_max_gcal': lambda calc: 0.0008598452 * calc['Q_heat_max'],
+    #q(h,T) = qh_u,m × Ui/(1000 × T)
+    'q_h_T': lambda calc: calc.cd['q_h'] * calc.U / (1000 * calc.T),
+    #Q(h,T) = 1,16 × q(h,T) × (t(h) – t(с)) + Q(ht)
+    'Q_heat_avg': lambda calc: 1.16 * calc['q_h_T'] * (calc.t_h - calc.t_c) + 0.4 * calc['q_hr_h'],
+    'Q_heat_avg_gcal': lambda calc: 0.0008598452 * calc['Q_heat_avg'],
+})
+
+# Строки таблицы результатов: (наименование, величина, ед. изм.)
+LOAD_ROWS = [
+    ("Секундная вероятность действия приборов обшая (P_tot*N)", 'PN_tot', "-"),
+    ("Секундная вероятность действия приборов на ГВС (P_h*N)", 'PN_h', "-"),
+    ("Секундная вероятность действия приборов на ХВС (P_c*N)", 'PN_c', "-"),
+
+    ("Альфа секундная общая (a_tot)", 'alpha_tot', "-"),
+    ("Альфа секундная на ГВС (a_h)", 'alpha_h', "-"),
+    ("Альфа секундная на ХВС (a_c)", 'alpha_c', "-"),
+
+    ("Расчётный секундный расход общий (q_tot)", 'q_tot', "л/с"),
+    ("Расчётный секундный расход на ГВС (q_h)", 'q_h', "л/с"),
+    ("Расчётный секундный расход на ХВС (q_c)", 'q_c', "л/с"),
+
+    ("Часовая вероятность действия приборов общая (P_tot*N)", 'PN_hr_tot', "-"),
+    ("Часовая вероятность действия приборов на ГВС(P_h*N)", 'PN_hr_h', "-"),
+    ("Часовая вероятность действия приборов на ХВС (P_c*N)", 'PN_hr_c', "-"),
+
+    ("Альфа часовая общая (a_tot_hr)", 'alpha_hr_tot', "-"),
+    ("Альфа часовая на ГВС(a_h_hr)", 'alpha_hr_h', "-"),
+    ("Альфа часовая на ХВС (a_c_hr)", 'alpha_hr_c', "-"),
+
+    ("Часовой расход общий (q_tot_hr)", 'q_hr_tot', "м³/ч"),
+    ("Часовой расход на ГВС (q_h_hr)", 'q_hr_h', "м³/ч"),
+    ("Часовой расход на ХВС (q_c_hr)", 'q_hr_c', "м³/ч"),
+
+    ("Суточный расход общий (Q_сут_tot)", 'Q_day_tot', "м³/сут"),
+    ("Суточный расход на ГВС (Q_сут_h)", 'Q_day_h', "м³/сут"),
+    ("Суточный расход на ХВС (Q_сут_c)", 'Q_day_c', "м³/сут"),
+
+    ("Расход тепла на ГВС максимальный (Q(h,hr))", 'Q_heat_max', "кВт"),
+    ("Расход тепла на ГВС максимальный (Q(h,hr))", 'Q_heat_max_gcal', "Гкал/ч"),
+    ("Расход тепла на ГВС средний (Q(h,T))", 'Q_heat_avg', "кВт"),
+    ("Расход тепла на ГВС средний (Q(h,T))", 'Q_heat_avg_gcal', "Гкал/ч"),
+]
+
+class LoadCalculation:
+    """Расчёт нагрузок для U приборов потребителя
+
+    Промежуточные величины (P*N, alpha, q, q_hr, Q_сут, Q_тепл) доступны по имени:
+    calc['alpha_hr_h']. Каждая вычисляется один раз и запоминается,
+    поэтому их можно запрашивать по отдельности без повторной интерполяции.
+    """
+
+    def __init__(self, consumer_data: Dict[str, Any], U: float, t_h: float = 60,
+                 t_c: float = 5, T: float = 24):
+        self.cd = consumer_data
+        self.U = U
+        self.t_h = t_h
+        self.t_c = t_c
+        self.T = T
+        self._values = {}
+
+    def __getitem__(self, name: str) -> float:
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        value = LOAD_FORMULAS[name](self)
+        self._values[name] = value
+        return value
+
+    def results(self) -> List[LoadResult]:
+        return [LoadResult(parameter, self[name], unit, name) for parameter, name, unit in LOAD_ROWS]
+
+def calculate_load(consumer_data: Dict[str, Any], U: float, t_h: float = 60,
+                   t_c: float = 5, T: float = 24) -> List[LoadResult]:
+    """Расчёт нагрузок (расходы воды и тепла) для U приборов потребителя"""
+    with PROFILER.stage("load_calc"):
+        return LoadCalculation(consumer_data, U, t_h, t_c, T).results()
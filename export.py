@@ -0,0 +1,325 @@
+#export.py
+
+import csv
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, List, Dict, Iterable, Iterator, Optional, TypeVar
+import numpy as np
+from engine import CalculationResult, LoadResult
+import columnar
+import docxtable
+from profiling import PROFILER
+from xlsxstream import XlsxStreamWriter
+
+RESULT_HEADERS = {
+    "cold": [
+        "t", "U", "D", "q_(c)hru", "q_(c)0",
+        "Группа (t_num)", "Потребитель",
+        "Pc*N", "alpha", "Q", "Скорость"
+    ],
+    "hot": [
+        "t", "U", "D", "q_(h)hru", "q_(h)0",
+        "Группа (t_num)", "Потребитель",
+        "Ph*N", "alpha", "Q", "Скорость"
+    ],
+    "total": [
+        "t", "U", "D", "q_(tot)hru", "q_(tot)0",
+        "Группа (t_num)", "Потребитель",
+        "Ptot*N", "alpha", "Q", "Скорость"
+    ],
+}
+
+# Форматы, в которые сохраняются результаты (по расширению файла)
+FORMATS = ['csv', 'xlsx', 'docx', 'npz']
+
+LOAD_HEADERS = ['Параметр', 'Значение', 'Ед. изм.']
+
+TEXT = {
+    "unsupported_format": "Неподдерживаемый формат файла"
+}
+
+# Обратный вызов прогресса: получает число записанных строк.
+# Чтобы прервать сохранение, он может выбросить ExportCancelled.
+Progress = Optional[Callable[[int], None]]
+
+Row = TypeVar('Row')
+
+class ExportCancelled(Exception):
+    pass
+
+def track(rows: Iterable[Row], progress: Progress) -> Iterable[Row]:
+    """Перебирает строки, сообщая в progress число уже записанных"""
+    if progress is None:
+        return rows
+    return _tracked(rows, progress)
+
+def _tracked(rows: Iterable[Row], progress: Callable[[int], None]) -> Iterator[Row]:
+    for count, row in enumerate(rows, 1):
+        yield row
+        progress(count)
+
+@contextmanager
+def atomic_output(file_path: str) -> Iterator[str]:
+    """Путь временного файла рядом с file_path; после успешной записи он заменяет file_path
+
+    При ошибке или отмене временный файл удаляется, а прежний file_path
+    (если он был) остаётся нетронутым, поэтому недописанные результаты не
+    остаются рядом с готовыми.
+    """
+    directory, name = os.path.split(os.path.abspath(file_path))
+    # Расширение сохраняется: по нему выбирается формат записи
+    temp_path = os.path.join(
+        directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp{os.path.splitext(name)[1]}"
+    )
+    try:
+        yield temp_path
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def file_extension(file_path: str) -> str:
+    return file_path.split('.')[-1].lower()
+
+def section_row(result: CalculationResult) -> list:
+    return [
+        result.t, result.U, result.D, result.q_chru, result.q_c0,
+        result.group, result.consumer, result.PcN,
+        result.alpha, result.Q, result.velocity
+    ]
+
+def load_rows(results: Iterable[LoadResult]) -> List[Dict[str, Any]]:
+    """Строки таблицы нагрузок в том виде, в каком они показываются в окне расчёта
+
+    name и number (значение без округления) нужны только для формата npz.
+    """
+    return [
+        {"parameter": result.parameter, "value": f"{result.value:.4f}", "unit": result.unit,
+         "name": result.name, "number": result.value}
+        for result in results
+    ]
+
+class SectionWriter:
+    """Запись результатов гидравлического расчёта порциями
+
+    write() принимает очередную порцию результатов, close() завершает файл.
+    Используется как контекст: при исключении внутри with файл не дописывается,
+    а открытые ресурсы освобождаются.
+    """
+
+    def __init__(self, file_path: str, headers: List[str], progress: Progress = None):
+        self.file_path = file_path
+        self.headers = headers
+        self.progress = progress
+        self.written = 0
+
+    def __enter__(self) -> 'SectionWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, results: Iterable[CalculationResult]) -> None:
+        for result in results:
+            self._append(result)
+            self.written += 1
+            if self.progress is not None:
+                self.progress(self.written)
+
+    def _append(self, result: CalculationResult) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        pass
+
+class CsvSectionWriter(SectionWriter):
+    def __init__(self, file_path: str, headers: List[str], progress: Progress = None):
+        super().__init__(file_path, headers, progress)
+        self._file = open(file_path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(headers)
+
+    def _append(self, result: CalculationResult) -> None:
+        self._writer.writerow(section_row(result))
+
+    def close(self) -> None:
+        self._file.close()
+
+    def abort(self) -> None:
+        self._file.close()
+
+class ExcelSectionWriter(SectionWriter):
+    """Потоковая запись в XLSX: строки пишутся по мере поступления результатов"""
+
+    def __init__(self, file_path: str, headers: List[str], progress: Progress = None):
+        super().__init__(file_path, headers, progress)
+        self._writer = XlsxStreamWriter(file_path, "Результаты расчёта")
+        self._writer.append(headers)
+
+    def _append(self, result: CalculationResult) -> None:
+        self._writer.append(section_row(result))
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def abort(self) -> None:
+        self._writer.abort()
+
+def section_docx_row(result: CalculationResult) -> List[str]:
+    return [
+        str(result.t), str(result.U), str(result.D), str(result.q_chru),
+        str(result.q_c0), str(result.group), result.consumer,
+        f"{result.PcN:.4f}", f"{result.alpha:.4f}",
+        f"{result.Q:.4f}", f"{result.velocity:.4f}"
+    ]
+
+def consumer_title(results: Iterable[CalculationResult]) -> str:
+    return "; ".join(dict.fromkeys(str(result.consumer) for result in results))
+
+class DocxSectionWriter(SectionWriter):
+    """Сохраняет результаты в документ Word
+
+    Таблица DOCX строится в памяти, поэтому результаты накапливаются до close(),
+    а progress сообщает о строках по мере заполнения таблицы. Если consumer
+    не задан, заголовок составляется из потребителей всех результатов.
+    rows_per_table разбивает длинную таблицу на части с заголовком на каждой странице.
+    """
+
+    def __init__(self, file_path: str, headers: List[str], progress: Progress = None,
+                 consumer: Optional[str] = None, rows_per_table: Optional[int] = None):
+        super().__init__(file_path, headers, progress)
+        self.consumer = consumer
+        self.rows_per_table = rows_per_table
+        self._results: List[CalculationResult] = []
+
+    def write(self, results: Iterable[CalculationResult]) -> None:
+        self._results.extend(results)
+
+    def close(self) -> None:
+        from docx import Document
+        consumer = self.consumer if self.consumer is not None else consumer_title(self._results)
+        doc = Document()
+        doc.add_heading(f"Результаты расчёта: {consumer}", level=1)
+
+        rows = (section_docx_row(result) for result in track(self._results, self.progress))
+        docxtable.add_table(doc, self.headers, rows, rows_per_table=self.rows_per_table)
+
+        doc.save(self.file_path)
+        self._results = []
+
+# Столбцы файла npz: имя -> (поле CalculationResult, тип)
+SECTION_COLUMNS = {
+    "t": ("t", np.float64),
+    "U": ("U", np.float64),
+    "D": ("D", np.int64),
+    "q_hru": ("q_chru", np.float64),
+    "q_0": ("q_c0", np.float64),
+    "group": ("group", np.str_),
+    "consumer": ("consumer", np.str_),
+    "PcN": ("PcN", np.float64),
+    "alpha": ("alpha", np.float64),
+    "Q": ("Q", np.float64),
+    "velocity": ("velocity", np.float64),
+}
+
+class NpzSectionWriter(SectionWriter):
+    """Сохраняет результаты столбцами в .npz (см. columnar.py)"""
+
+    def __init__(self, file_path: str, headers: List[str], progress: Progress = None):
+        super().__init__(file_path, headers, progress)
+        self._values = {name: [] for name in SECTION_COLUMNS}
+
+    def _append(self, result: CalculationResult) -> None:
+        for name, (field, _) in SECTION_COLUMNS.items():
+            self._values[name].append(getattr(result, field))
+
+    def close(self) -> None:
+        columnar.save(self.file_path, {
+            name: np.array(self._values[name], dtype=dtype) for name, (_, dtype) in SECTION_COLUMNS.items()
+        })
+
+def section_writer(file_path: str, headers: List[str], consumer: Optional[str] = None,
+                   progress: Progress = None) -> SectionWriter:
+    """Открывает запись результатов в формате по расширению файла"""
+    extension = file_extension(file_path)
+    if extension == 'csv':
+        return CsvSectionWriter(file_path, headers, progress)
+    if extension == 'xlsx':
+        return ExcelSectionWriter(file_path, headers, progress)
+    if extension == 'docx':
+        return DocxSectionWriter(file_path, headers, progress, consumer)
+    if extension == 'npz':
+        return NpzSectionWriter(file_path, headers, progress)
+    raise ValueError(TEXT["unsupported_format"])
+
+def save_sections(file_path: str, results: Iterable[CalculationResult], headers: List[str],
+                  consumer: Optional[str] = None, progress: Progress = None) -> None:
+    """Сохраняет результаты гидравлического расчёта в формате по расширению файла"""
+    with PROFILER.stage("export"):
+        with section_writer(file_path, headers, consumer, progress) as writer:
+            writer.write(results)
+
+def save_load_docx(file_path: str, data: List[Dict[str, str]], progress: Progress = None,
+                   rows_per_table: Optional[int] = None) -> None:
+    """Сохраняет результаты расчёта нагрузок в документ Word"""
+    from docx import Document
+    doc = Document()
+
+    # Добавляем заголовок
+    doc.add_heading('Результаты расчёта нагрузок', level=1)
+
+    # Таблица: заголовки и строки данных
+    rows = ([item['parameter'], item['value'], item['unit']] for item in track(data, progress))
+    docxtable.add_table(doc, LOAD_HEADERS, rows, rows_per_table=rows_per_table)
+
+    doc.save(file_path)
+
+def save_load_csv(file_path: str, data: List[Dict[str, str]], progress: Progress = None) -> None:
+    """Сохраняет результаты расчёта нагрузок в CSV файл"""
+    with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=LOAD_HEADERS)
+
+        writer.writeheader()
+        for item in track(data, progress):
+            writer.writerow({
+                'Параметр': item['parameter'],
+                'Значение': item['value'],
+                'Ед. изм.': item['unit']
+            })
+
+def save_load_excel(file_path: str, data: List[Dict[str, str]], progress: Progress = None) -> None:
+    """Сохраняет результаты расчёта нагрузок в Excel файл"""
+    # Ширина столбцов подбирается по ходу записи строк
+    with XlsxStreamWriter(file_path, "Результаты расчёта") as writer:
+        writer.append(LOAD_HEADERS)
+        for item in track(data, progress):
+            writer.append([item['parameter'], item['value'], item['unit']])
+
+def save_load_npz(file_path: str, data: List[Dict[str, Any]], progress: Progress = None) -> None:
+    """Сохраняет результаты расчёта нагрузок в .npz: по столбцу на каждую величину"""
+    columnar.save(file_path, {
+        item['name']: np.array([item['number']], dtype=np.float64) for item in track(data, progress)
+    })
+
+def save_load(file_path: str, data: List[Dict[str, Any]], progress: Progress = None) -> None:
+    """Сохраняет результаты расчёта нагрузок в формате по расширению файла"""
+    extension = file_extension(file_path)
+    with PROFILER.stage("export"):
+        if extension == 'docx':
+            save_load_docx(file_path, data, progress)
+        elif extension == 'csv':
+            save_load_csv(file_path, data, progress)
+        elif extension == 'xlsx':
+            save_load_excel(file_path, data, progress)
+        elif extension == 'npz':
+            save_load_npz(file_path, data, progress)
+        else:
+            raise ValueError(TEXT["unsupported_format"])
@@ -0,0 +1,104 @@
+#importer.py
+
+import csv
+from itertools import islice
+from typing import Dict, Any, Iterable, Iterator, Tuple
+import numpy as np
+from profiling import PROFILER
+from sections import SectionStore
+
+# Формат таблицы:
+# Колонка A - номера типа потребителя
+# Колонка B - значения U (количество приборов)
+# Колонка C - диаметры D
+# Первая строка - заголовок
+
+TEXT = {
+    "unsupported_format": "Неподдерживаемый формат файла: {}"
+}
+
+CHUNK_SIZE = 10000
+
+def _number(value: Any) -> Any:
+    # В CSV из русской локали Excel дробная часть отделяется запятой
+    if isinstance(value, str):
+        value = value.strip().replace(',', '.')
+        return float(value) if value else None
+    return value
+
+def iter_excel_rows(file_path: str) -> Iterator[tuple]:
+    """Строки листа без заголовка; книга открывается только для чтения и не загружается целиком"""
+    import openpyxl
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = wb.active
+        yield from sheet.iter_rows(min_row=2, max_col=3, values_only=True)  # пропускаем заголовок
+    finally:
+        wb.close()
+
+def iter_csv_rows(file_path: str) -> Iterator[tuple]:
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(f, dialect)
+        next(reader, None)  # пропускаем заголовок
+        for row in reader:
+            try:
+                yield tuple(_number(value) for value in row[:3])
+            except ValueError:
+                yield tuple(row[:3])
+
+def iter_rows(file_path: str) -> Iterator[tuple]:
+    extension = file_path.split('.')[-1].lower()
+    if extension in ('xlsx', 'xlsm'):
+        return iter_excel_rows(file_path)
+    if extension == 'csv':
+        return iter_csv_rows(file_path)
+    raise ValueError(TEXT["unsupported_format"].format(file_path))
+
+def iter_raw_sections(file_path: str) -> Iterator[Dict[str, Any]]:
+    for row in iter_rows(file_path):
+        if len(row) >= 3 and row[0] and row[1] and row[2]:  # если все три значения есть
+            yield {
+                't': row[0],  # номер типа потребителя
+                'U': row[1],  # количество приборов
+                'D': row[2]   # диаметр
+            }
+
+def iter_validated(data: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    for item in data:
+        try:
+            yield {
+                't': float(item['t']),
+                'U': float(item['U']),
+                'D': int(item['D'])
+            }
+        except (ValueError, TypeError, KeyError):
+            continue
+
+def iter_sections(file_path: str) -> Iterator[Dict[str, Any]]:
+    """Лениво читает и проверяет участки: память не зависит от размера листа"""
+    raw = PROFILER.timed_iter("import", iter_raw_sections(file_path))
+    return PROFILER.timed_iter("validate", iter_validated(raw))
+
+def iter_section_chunks(sections: Iterable[Dict[str, Any]],
+                        chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Группирует участки в массивы (t, U, D) не более chunk_size элементов для пакетного расчёта"""
+    sections = iter(sections)
+    while True:
+        chunk = list(islice(sections, chunk_size))
+        if not chunk:
+            return
+        yield (
+            np.array([item['t'] for item in chunk]),
+            np.array([item['U'] for item in chunk]),
+            np.array([item['D'] for item in chunk])
+        )
+
+def read_store(file_path: str, chunk_size: int = CHUNK_SIZE) -> SectionStore:
+    """Читает и проверяет участки файла сразу в столбцы хранилища"""
+    return SectionStore.from_chunks(iter_section_chunks(iter_sections(file_path), chunk_size))
@@ -0,0 +1,95 @@
+#incremental.py
+
+"""Пересчёт только изменённых участков списка
+
+IncrementalCalculation хранит результаты каждого участка SectionStore по
+его номеру (row_id). update() считает лишь участки, добавленные или
+изменённые после прошлого расчёта (store.take_changed()), а при смене
+общего типа потребителя - ещё и участки без своего t. Результаты
+остальных участков не пересоздаются. Участки считаются независимо друг от
+друга, поэтому частичный пересчёт даёт то же, что и полный.
+(Пересчёт сети с путями к вводу - в network.PipeNetwork.)
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import engine
+from engine import CalculationResult
+from sections import SectionStore
+
+TEXT = {
+    "invalid_t": "Введите тип потребителя.",
+    "section_error": "Ошибка в расчётах участка: {}",
+    "u_missing": "не задано U на участке №{}"
+}
+
+class IncrementalCalculation:
+    def __init__(self, store: SectionStore, systems: Iterable[str] = ("cold",)):
+        self.store = store
+        self.systems = tuple(systems)
+        self.t_default: Optional[float] = None
+        # row_id -> результаты участка по каждому потоку (в порядке systems)
+        self.results: Dict[int, Tuple[CalculationResult, ...]] = {}
+        # Участки, пересчитанные последним update()
+        self.updated: List[int] = []
+        self._pending = set()
+
+    def _dirty(self, t_default: Optional[float]) -> List[int]:
+        self._pending.update(self.store.take_changed().tolist())
+        if t_default != self.t_default:
+            # Участки без своего t считаются по общему типу потребителя
+            t = self.store.columns()[0]
+            self._pending.update(self.store.ids()[np.isnan(t)].tolist())
+        return sorted(row_id for row_id in self._pending if row_id in self.store)
+
+    def _columns(self, row_ids: List[int], t_default: Optional[float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        t, U, D = self.store.get_columns(row_ids)
+        missing_t = np.isnan(t)
+        if np.any(missing_t):
+            if t_default is None:
+                raise ValueError(TEXT["invalid_t"])
+            t[missing_t] = t_default
+        missing_U = np.flatnonzero(np.isnan(U))
+        if len(missing_U):
+            # Номер участка в сообщении - позиция в списке, как его видит пользователь
+            position = min(self.store.position(row_ids[i]) for i in missing_U)
+            raise ValueError(TEXT["section_error"].format(TEXT["u_missing"].format(position + 1)))
+        return t, U, D
+
+    def columns(self, t_default: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Столбцы t, U, D всех участков в порядке списка, с теми же проверками, что и при расчёте"""
+        return self._columns(self.store.ids().tolist(), t_default)
+
+    def update(self, t_default: Optional[float] = None) -> List[int]:
+        """Пересчитывает изменённые участки; возвращает их номера
+
+        t_default - общий тип потребителя для участков без своего t.
+        При ошибке отметки изменённых участков сохраняются до следующего вызова.
+        """
+        row_ids = self._dirty(t_default)
+        if row_ids:
+            t, U, D = self._columns(row_ids, t_default)
+            batches = engine.calculate_streams_batch(U, D, t, self.systems)
+            results = [batches[system].to_results() for system in self.systems]
+            for row_id, values in zip(row_ids, zip(*results)):
+                self.results[row_id] = values
+
+        # Результаты удалённых участков больше не нужны
+        if len(self.results) > len(self.store):
+            ids = set(self.store.ids().tolist())
+            self.results = {row_id: values for row_id, values in self.results.items() if row_id in ids}
+
+        self.t_default = t_default
+        self._pending.clear()
+        self.updated = row_ids
+        return row_ids
+
+    def result_lists(self) -> Dict[str, List[CalculationResult]]:
+        """Результаты всех участков в порядке списка, по потокам"""
+        rows = [self.results[row_id] for row_id in self.store.ids().tolist()]
+        return {system: [values[k] for values in rows] for k, system in enumerate(self.systems)}
+
+    def invalidate(self) -> None:
+        """Следующий update() пересчитает все участки"""
+        self.results = {}
+        self._pending.update(self.store.ids().tolist())
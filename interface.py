@@ -1,462 +1,420 @@
 #interface.py
 
-import csv
+import os
+import threading
 import tkinter as tk
-from tkinter import messagebox, StringVar, Toplevel, ttk
-import numpy as np
-import data
-from openpyxl import Workbook
-from docx import Document
+from tkinter import messagebox, Toplevel, ttk
+import engine
+import export
+import importer
+import lookup
+from engine import CalculationResult
+from incremental import IncrementalCalculation
+from profiling import PROFILER
+from sections import SectionStore
 import tkinter.filedialog
-from typing import List, Tuple, Dict, Optional, Union, Any
-from dataclasses import dataclass
+import numpy as np
+from functools import partial
+from typing import Callable, List, Tuple, Dict, Optional, Union, Any
 from enum import Enum
 
-@dataclass
-class CalculationResult:
-    t: float
-    U: float
-    D: int
-    q_chru: float
-    q_c0: float
-    group: int
-    consumer: str
-    PcN: float
-    alpha: float
-    Q: float
-    velocity: float
-
 class FileType(Enum):
     CSV = ("CSV files", "*.csv")
     EXCEL = ("Excel files", "*.xlsx")
     WORD = ("Word documents", "*.docx")
+    NUMPY = ("NumPy columns", "*.npz")
+
+class ExportTask:
+    """Сохранение результатов в фоновом потоке с индикатором прогресса и кнопкой отмены
+
+    Поток только пишет файл; окна Tk обновляются из главного потока
+    через after(), который опрашивает состояние задачи.
+    """
+    POLL_MS = 100
 
-class ConsumerCalculator:
-    RESULT_HEADERS = [
-        "t", "U", "D", "q_(c)hru", "q_(c)0", 
-        "Группа (t_num)", "Потребитель", 
-        "Pc*N", "alpha", "Q", "Скорость"
-    ]
-    
     TEXT = {
-        "title": "Гидравлический расчёт системы водоснабжения по СП 30.13330.2020",
-        "consumer_label": "СП 30.13330",
-        "t_entry_default": "Введите номер потребителя",
-        "u_entry_default": "Введите U",
-        "add_section": "➕ Добавить участок",
-        "delete_section": "❌ Удалить участок",
-        "calculate": "▶️ Рассчитать",
-        "show_results": "↪️ Результаты расчёта",
-        "save_results": "⏫ Сохранить результаты",
+        "title": "Сохранение результатов",
+        "saving": "Сохранение: {} из {}",
+        "cancel": "Отмена",
+        "cancelled": "Сохранение отменено.",
         "success": "Успех",
-        "error": "Ошибка",
-        "file_not_saved": "Файл не сохранён.",
-        "calculation_success": "Расчёт выполнен успешно.",
-        "no_data": "Нет данных для отображения.",
-        "invalid_t": "Введите тип потребителя.",
-        "t_not_found": "Значение t={} не найдено в массиве.",
-        "section_error": "Ошибка в расчётах участка: {}",
-        "interpolation_error": "Не удалось выполнить интерполяцию.",
-        "velocity_error": "Не удалось вычислить значение скорости."
+        "error": "Ошибка"
     }
 
-    def __init__(self, master: tk.Tk):
+    def __init__(self, master, save: Callable[[export.Progress], None], total: int,
+                 file_paths: List[str], success_message: str, error_message: str):
         self.master = master
-        self.current_consumer_data = None
-        self.master.title(self.TEXT["title"])
-        self.master.minsize(800, 600)
-        
-        self.entries = []
-        self.results = []
-        self.current_consumer = ""
-        
-        self._setup_ui()
-        self.add_section()
+        self.save = save
+        self.total = total
+        self.file_paths = file_paths
+        self.success_message = success_message
+        self.error_message = error_message
+
+        self.written = 0
+        self.error = None
+        self.cancelled = False
+        self.cancel_event = threading.Event()
+
+        self._create_window()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.window.after(self.POLL_MS, self._poll)
+
+    def _create_window(self) -> None:
+        self.window = Toplevel(self.master)
+        self.window.title(self.TEXT["title"])
+        self.window.transient(self.master)
+        self.window.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        frame = ttk.Frame(self.window, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        self.label = ttk.Label(frame, text=self.TEXT["saving"].format(0, self.total))
+        self.label.pack(fill=tk.X)
+
+        self.progressbar = ttk.Progressbar(frame, length=300, maximum=max(self.total, 1))
+        self.progressbar.pack(fill=tk.X, pady=10)
+
+        ttk.Button(frame, text=self.TEXT["cancel"], command=self.cancel).pack()
+
+    def _progress(self, count: int) -> None:
+        # Вызывается из фонового потока: только запоминаем число строк
+        self.written = count
+        if self.cancel_event.is_set():
+            raise export.ExportCancelled()
+
+    def _run(self) -> None:
+        try:
+            self.save(self._progress)
+        except export.ExportCancelled:
+            # Файлы пишутся через export.atomic_output: недописанные уже удалены,
+            # прежние файлы пользователя не тронуты
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
 
-    def _setup_ui(self) -> None:
-        self._create_input_panel()
-        self._create_scrollable_area()
-      
-    def _create_input_panel(self) -> None:
-        input_frame = ttk.Frame(self.master, padding="10")
-        input_frame.pack(fill=tk.X)
-        
-        ttk.Label(input_frame, text=self.TEXT["consumer_label"]).pack(side=tk.LEFT, padx=5)
+    def cancel(self) -> None:
+        self.cancel_event.set()
 
-        ttk.Button(
-            input_frame, text="◀️ Расчёт нагрузок",
-            command=self.open_load_calculator
-        ).pack(side=tk.LEFT, padx=5)
-        
-        self.t_entry = ttk.Entry(input_frame)
-        self.t_entry.pack(side=tk.LEFT, padx=5, expand=True, fill=tk.X)
-        self.t_entry.insert(0, self.TEXT["t_entry_default"])
-        
-        buttons = [
-            (self.TEXT["calculate"], self.calculate),
-            (self.TEXT["show_results"], self.show_results),
-            (self.TEXT["save_results"], self.save_results)
-        ]
-        
-        for text, command in buttons:
-            ttk.Button(
-                input_frame, text=text, command=command
-            ).pack(side=tk.LEFT, padx=5)
+    def _poll(self) -> None:
+        self.progressbar["value"] = self.written
+        self.label.configure(text=self.TEXT["saving"].format(self.written, self.total))
 
-    def open_load_calculator(self):
-        try:
-            if not self.current_consumer_data:
-                raise ValueError("Сначала выполните гидравлический расчёт")
-                
-            LoadCalculator(self.master, self.current_consumer_data)
-        except ValueError as e:
-            messagebox.showerror("Ошибка", str(e))
+        if self.thread.is_alive():
+            self.window.after(self.POLL_MS, self._poll)
+            return
 
-    def _create_scrollable_area(self) -> None:
-        container = ttk.Frame(self.master)
-        container.pack(fill=tk.BOTH, expand=True)
-        
-        self.canvas = tk.Canvas(container)
-        scrollbar_y = ttk.Scrollbar(container, orient="vertical", command=self.canvas.yview)
-        scrollbar_x = ttk.Scrollbar(container, orient="horizontal", command=self.canvas.xview)
-        
-        self.scrollable_frame = ttk.Frame(self.canvas)
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar_y.set)
-        self.canvas.configure(xscrollcommand=scrollbar_x.set)
-        
-        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar_y.pack(side=tk.RIGHT, fill=tk.Y)
-        scrollbar_x.pack(side=tk.BOTTOM, fill=tk.X)
+        self.window.destroy()
+        if self.error is not None:
+            messagebox.showerror(self.TEXT["error"], self.error_message.format(str(self.error)))
+        elif self.cancelled:
+            messagebox.showwarning(self.TEXT["title"], self.TEXT["cancelled"])
+        else:
+            messagebox.showinfo(self.TEXT["success"], self.success_message.format("\n".join(self.file_paths)))
 
-    def add_section(self, after_frame: Optional[tk.Frame] = None) -> None:
-        new_frame = ttk.Frame(self.scrollable_frame, padding="5")
-    
-        u_entry = ttk.Entry(new_frame)
-        u_entry.pack(side=tk.LEFT, padx=5)
-        u_entry.insert(0, self.TEXT["u_entry_default"])
+class SectionEditor(ttk.Frame):
+    """Таблица участков с редактированием на месте
 
-        diam_values = [d for d in data.diam_values if d > 0]
-        diam_str_values = [str(int(d)) for d in diam_values]
-    
-        diam_var = StringVar(value=diam_str_values[0])
-        diam_menu = ttk.OptionMenu(
-            new_frame, 
-            diam_var, 
-            diam_str_values[0],
-            *diam_str_values
-        )
-        diam_menu.pack(side=tk.LEFT, padx=5)
+    Строки Treeview создаются только для видимой части списка: при прокрутке
+    в них подставляются другие участки модели, поэтому число виджетов и время
+    импорта не зависят от числа участков.
 
-        ttk.Button(
-            new_frame, text=self.TEXT["add_section"],
-            command=lambda: self.add_section(new_frame)
-        ).pack(side=tk.LEFT, padx=5)
-    
-        ttk.Button(
-            new_frame, text=self.TEXT["delete_section"],
-            command=lambda: self.remove_section(new_frame)
-        ).pack(side=tk.LEFT, padx=5)
+    on_change вызывается после каждого изменения участков, а при вводе t и U -
+    ещё и на каждое нажатие клавиши с корректным значением (Escape возвращает
+    прежнее значение).
+    """
+    COLUMNS = ("number", "t", "U", "D")
 
-        if after_frame:
-            for i, (_, _, frame) in enumerate(self.entries):
-                if frame == after_frame:
-                    self.entries.insert(i+1, (u_entry, diam_var, new_frame))
-                    new_frame.pack(in_=self.scrollable_frame, after=after_frame)
-                    break
-        else:
-            self.entries.append((u_entry, diam_var, new_frame))
-            new_frame.pack(in_=self.scrollable_frame)
+    TEXT = {
+        "number": "№",
+        "t": "t (пусто - общий)",
+        "U": "U",
+        "D": "D",
+        "add_section": "➕ Добавить участок",
+        "delete_section": "❌ Удалить участок",
+        "error": "Ошибка",
+        "last_section": "Нельзя удалить последний участок",
+        "invalid_value": "Некорректное значение: {}"
+    }
+
+    def __init__(self, master, model: SectionStore, on_change: Optional[Callable[[], None]] = None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.model = model
+        self.on_change = on_change
+        self.offset = 0
+        self.visible_rows = 20
+        self.selected_id = None
+        self.editor_widget = None
+        self.editor_original = None
+        self.diam_str_values = [str(int(d)) for d in lookup.DIAMETERS if d > 0]
+
+        style = ttk.Style(self)
+        self.row_height = int(style.lookup("Treeview", "rowheight") or 20)
+
+        self._create_widgets()
+
+    def _create_widgets(self) -> None:
+        buttons = ttk.Frame(self)
+        buttons.pack(fill=tk.X)
+        ttk.Button(buttons, text=self.TEXT["add_section"], command=self.add_section).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text=self.TEXT["delete_section"], command=self.remove_section).pack(side=tk.LEFT, padx=5)
+
+        table = ttk.Frame(self)
+        table.pack(fill=tk.BOTH, expand=True)
+
+        self.tree = ttk.Treeview(table, columns=self.COLUMNS, show="headings", selectmode="browse")
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=self.TEXT[column])
+            self.tree.column(column, width=60 if column == "number" else 150, anchor=tk.CENTER)
+
+        self.scrollbar = ttk.Scrollbar(table, orient="vertical", command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<Double-1>", self._on_double_click)
+        self.tree.bind("<Return>", self._on_return)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self._move_selection(-self.visible_rows))
+        self.tree.bind("<Next>", lambda e: self._move_selection(self.visible_rows))
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1) or "break")
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1) or "break")
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1) or "break")
 
-    def remove_section(self, frame: tk.Frame) -> None:
-        if len(self.entries) <= 1:
-            messagebox.showwarning(self.TEXT["error"], "Нельзя удалить последний участок")
+    @staticmethod
+    def _format(value: float) -> str:
+        if value != value:  # nan - значение не задано
+            return ""
+        return str(int(value)) if float(value).is_integer() else str(value)
+
+    def refresh(self) -> None:
+        """Перерисовывает видимые строки по модели"""
+        self._close_editor()
+        total = len(self.model)
+        self.offset = max(0, min(self.offset, total - self.visible_rows))
+
+        self.tree.delete(*self.tree.get_children())
+        for i, (row_id, t, U, D) in enumerate(self.model.rows(self.offset, self.offset + self.visible_rows)):
+            self.tree.insert("", tk.END, iid=str(row_id), values=(
+                self.offset + i + 1, self._format(t), self._format(U), str(D)
+            ))
+
+        if self.selected_id is not None and self.tree.exists(str(self.selected_id)):
+            self.tree.selection_set(str(self.selected_id))
+            self.tree.focus(str(self.selected_id))
+
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def reset(self) -> None:
+        """Показывает список с начала после полной замены участков"""
+        self.offset = 0
+        self.selected_id = None
+        self.refresh()
+
+    def scroll(self, rows: int) -> None:
+        self.offset += rows
+        self.refresh()
+
+    def scroll_to(self, row_id: int) -> None:
+        position = self.model.position(row_id)
+        if position < self.offset:
+            self.offset = position
+        elif position >= self.offset + self.visible_rows:
+            self.offset = position - self.visible_rows + 1
+        self.refresh()
+
+    def _on_scrollbar(self, action: str, *args) -> None:
+        if action == "moveto":
+            self.offset = int(float(args[0]) * len(self.model))
+        elif action == "scroll":
+            step = self.visible_rows if args[1] == "pages" else 1
+            self.offset += int(args[0]) * step
+        self.refresh()
+
+    def _on_resize(self, event) -> None:
+        # Одна строка занята заголовком таблицы
+        rows = max(1, event.height // self.row_height - 1)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.refresh()
+
+    def _on_select(self, event) -> None:
+        selection = self.tree.selection()
+        if selection:
+            self.selected_id = int(selection[0])
+
+    def _move_selection(self, step: int) -> str:
+        if self.selected_id is None or not len(self.model):
+            return "break"
+        position = self.model.position(self.selected_id) + step
+        position = max(0, min(position, len(self.model) - 1))
+        self.selected_id = self.model.rows(position, position + 1)[0][0]
+        self.scroll_to(self.selected_id)
+        return "break"
+
+    def _changed(self) -> None:
+        if self.on_change is not None:
+            self.on_change()
+
+    def add_section(self) -> None:
+        """Добавляет участок после выбранного (или в конец списка)"""
+        if self.selected_id is None:
+            row_id = self.model.append()
+        else:
+            row_id = self.model.insert_after(self.selected_id)
+        self.selected_id = row_id
+        self.scroll_to(row_id)
+        self._changed()
+
+    def remove_section(self) -> None:
+        if len(self.model) <= 1:
+            messagebox.showwarning(self.TEXT["error"], self.TEXT["last_section"])
+            return
+        if self.selected_id is None:
             return
-            
-        frame.destroy()
-        self.entries = [entry for entry in self.entries if entry[2] != frame]
 
-    def calculate(self) -> None:
-        self.results.clear()
-        
-        try:
-            t_input = self._validate_t_input()
-            index, params = self._get_consumer_params(t_input)
-            
-            self.current_consumer_data = {
-                't_input': t_input,
-                'index': index,
-                'params': params,
-                'q_tot_hru': data.q_tot_hru_values[index],
-                'q_h_hru': data.q_h_hru_values[index],
-                'q_c_hru': data.q_c_hru_values[index],
-                'q_tot': data.q_tot_values[index],
-                'q_h': data.q_h_values[index],
-                'q_c': data.q_c_values[index],
-                'q_tot_0': data.q_tot_0_values[index],
-                'q_h_0': data.q_h_0_values[index],
-                'q_c_0': data.q_c_0_values[index],
-                'q_tot_0_hr': data.q_tot_0_hr_values[index],
-                'q_h_0_hr': data.q_h_0_hr_values[index],
-                'q_c_0_hr': data.q_c_0_hr_values[index],
-                'consumer_name': params[3]
-            }
-            self.current_consumer = params[3]
-            
-            for u_entry, diam_var, _ in self.entries:
-                result = self._calculate_section(u_entry, diam_var, t_input, *params)
-                self.results.append(result)
-                
-            messagebox.showinfo(self.TEXT["success"], self.TEXT["calculation_success"])
-        except ValueError as e:
-            messagebox.showerror(self.TEXT["error"], str(e))
+        position = self.model.position(self.selected_id)
+        self.model.delete(self.selected_id)
+        position = min(position, len(self.model) - 1)
+        self.selected_id = self.model.rows(position, position + 1)[0][0]
+        self.refresh()
+        self._changed()
+
+    def _on_return(self, event) -> str:
+        if self.selected_id is not None:
+            self._open_editor(str(self.selected_id), "U")
+        return "break"
+
+    def _on_double_click(self, event) -> None:
+        item = self.tree.identify_row(event.y)
+        column = self.tree.identify_column(event.x)
+        if not item or not column:
+            return
+        name = self.COLUMNS[int(column[1:]) - 1]
+        if name != "number":
+            self._open_editor(item, name)
+
+    def _open_editor(self, item: str, column: str) -> None:
+        """Показывает поле ввода поверх ячейки"""
+        self._close_editor()
+        bbox = self.tree.bbox(item, column)
+        if not bbox:
+            return
+        x, y, width, height = bbox
+        current = self.tree.set(item, column)
+        self.editor_original = self.model.get(int(item))[self.COLUMNS.index(column) - 1]
+
+        if column == "D":
+            widget = ttk.Combobox(self.tree, values=self.diam_str_values, state="readonly")
+            widget.set(current)
+            widget.bind("<<ComboboxSelected>>", lambda e: self._commit(item, column))
+        else:
+            widget = ttk.Entry(self.tree)
+            widget.insert(0, current)
+            widget.select_range(0, tk.END)
+            widget.bind("<Return>", lambda e: self._commit(item, column))
+            widget.bind("<FocusOut>", lambda e: self._commit(item, column))
+            widget.bind("<KeyRelease>", lambda e: self._preview(item, column))
+        widget.bind("<Escape>", lambda e: self._cancel(item, column))
+
+        widget.place(x=x, y=y, width=width, height=height)
+        widget.focus_set()
+        self.editor_widget = widget
+
+    def _close_editor(self) -> None:
+        if self.editor_widget is not None:
+            widget, self.editor_widget = self.editor_widget, None
+            widget.destroy()
+            self.tree.focus_set()
 
-    def _validate_t_input(self) -> float:
+    @staticmethod
+    def _parse(text: str, column: str):
+        if column == "D":
+            return int(text)
+        if text:
+            return float(text.replace(',', '.'))
+        return float('nan')
+
+    def _preview(self, item: str, column: str) -> None:
+        """Промежуточное значение при вводе: модель меняется, поле ввода остаётся открытым"""
+        if self.editor_widget is None or self.on_change is None:
+            return
         try:
-            t_input = float(self.t_entry.get())
-            if t_input not in data.t_values:
-                raise ValueError(self.TEXT["t_not_found"].format(t_input))
-            return t_input
+            value = self._parse(self.editor_widget.get().strip(), column)
         except ValueError:
-            raise ValueError(self.TEXT["invalid_t"])
-
-    def _get_consumer_params(self, t_input: float) -> Tuple[int, Tuple[float, float, int, str]]:
-        index = np.where(data.t_values == t_input)[0][0]
-        return index, (
-            data.q_c_hru_values[index],
-            data.q_c_0_values[index],
-            data.t_num_values[index],
-            data.t_string_values[index]
-        )
+            return
+        current = self.model.get(int(item))[self.COLUMNS.index(column) - 1]
+        if value == current or (value != value and current != current):
+            return
+        self.model.set(int(item), column, value)
+        self.on_change()
 
-    def _calculate_section(self, u_entry: tk.Entry, diam_var: StringVar, 
-                          t_input: float, q_c_hru: float, q_c_0: float, 
-                          t_num: int, t_string: str) -> CalculationResult:
-        try:
-            U = float(u_entry.get())
-            D = int(diam_var.get())
-            v_values = data.v_dict[D]
-
-            x_input = (q_c_hru * U) / (3600 * q_c_0)
-            alpha = self._interpolate(x_input, data.x_values, data.y_values)
-            Q = 5 * q_c_0 * alpha
-            velocity = self._interpolate_velocity(Q, v_values)
-
-            return CalculationResult(
-                t=t_input, U=U, D=D, q_chru=q_c_hru, q_c0=q_c_0,
-                group=t_num, consumer=t_string, PcN=x_input,
-                alpha=alpha, Q=Q, velocity=velocity
-            )
-        except ValueError as e:
-            raise ValueError(self.TEXT["section_error"].format(str(e)))
+    def _cancel(self, item: str, column: str) -> None:
+        """Escape: закрывает поле ввода и возвращает значение, бывшее до его открытия"""
+        if self.editor_widget is None:
+            return
+        original = self.editor_original
+        current = self.model.get(int(item))[self.COLUMNS.index(column) - 1]
+        if original == current or (original != original and current != current):
+            self._close_editor()
+            return
+        self.model.set(int(item), column, original)
+        self.refresh()
+        self._changed()
 
-    def _interpolate_velocity(self, Q: float, v_values: List[float]) -> float:
-        q_values = data.q_values
+    def _commit(self, item: str, column: str) -> None:
+        if self.editor_widget is None:
+            return
+        text = self.editor_widget.get().strip()
         try:
-            if Q < q_values[0]:
-                return self._linear_interpolation(Q, q_values[0], q_values[1], v_values[0], v_values[1])
-            if Q > q_values[-1]:
-                return self._linear_interpolation(Q, q_values[-2], q_values[-1], v_values[-2], v_values[-1])
-            
-            for i in range(len(q_values) - 1):
-                if q_values[i] <= Q <= q_values[i + 1]:
-                    return self._linear_interpolation(Q, q_values[i], q_values[i + 1], v_values[i], v_values[i + 1])
-        except IndexError:
-            pass
-            
-        raise ValueError(self.TEXT["velocity_error"])
+            value = self._parse(text, column)
+        except ValueError:
+            self._close_editor()
+            messagebox.showerror(self.TEXT["error"], self.TEXT["invalid_value"].format(text))
+            return
 
-    @staticmethod
-    def _interpolate(x: float, x_values: List[float], y_values: List[float]) -> float:
-        try:
-            if x < x_values[0]:
-                return ConsumerCalculator._linear_interpolation(x, x_values[0], x_values[1], y_values[0], y_values[1])
-            if x > x_values[-1]:
-                return ConsumerCalculator._linear_interpolation(x, x_values[-2], x_values[-1], y_values[-2], y_values[-1])
-            
-            for i in range(len(x_values) - 1):
-                if x_values[i] <= x <= x_values[i + 1]:
-                    return ConsumerCalculator._linear_interpolation(x, x_values[i], x_values[i + 1], y_values[i], y_values[i + 1])
-        except IndexError:
-            pass
-            
-        raise ValueError(ConsumerCalculator.TEXT["interpolation_error"])
+        self.model.set(int(item), column, value)
+        self.refresh()
+        self._changed()
 
-    @staticmethod
-    def _linear_interpolation(x: float, x0: float, x1: float, y0: float, y1: float) -> float:
-        return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+class SectionCalculator:
+    """Гидравлический расчёт участков для одного или нескольких потоков (ХВС, ГВС, общий)
 
-    def show_results(self) -> None:
-        if not self.results:
-            messagebox.showwarning(self.TEXT["error"], self.TEXT["no_data"])
-            return
-        
-        results_window = Toplevel(self.master)
-        results_window.title(self.TEXT["show_results"])
-        results_window.minsize(800, 400)
-        
-        ttk.Label(
-            results_window, 
-            text=f"Потребитель: {self.current_consumer}", 
-            font=("Arial", 12, "bold")
-        ).pack(pady=10)
+    Все выбранные потоки считаются одним проходом engine.calculate_streams_batch
+    по одному и тому же списку участков. Повторный расчёт (IncrementalCalculation)
+    считает только изменённые участки; с флажком «Пересчитывать при вводе» он
+    запускается после каждой правки, а открытые таблицы результатов обновляются
+    на месте.
+    """
 
-        tree = ttk.Treeview(results_window, columns=self.RESULT_HEADERS, show="headings")
-        
-        for header in self.RESULT_HEADERS:
-            tree.heading(header, text=header)
-            tree.column(header, width=100, anchor=tk.CENTER)
-        
-        for result in self.results:
-            tree.insert("", tk.END, values=[
-                result.t, result.U, result.D, result.q_chru, result.q_c0,
-                result.group, result.consumer, round(result.PcN, 4),
-                round(result.alpha, 4), round(result.Q, 4), round(result.velocity, 4)
-            ])
-        
-        y_scroll = ttk.Scrollbar(results_window, orient="vertical", command=tree.yview)
-        x_scroll = ttk.Scrollbar(results_window, orient="horizontal", command=tree.xview)
-        tree.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
-        
-        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
-        x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
+    TITLES = {
+        ("cold",): "Гидравлический расчёт системы водоснабжения по СП 30.13330.2020",
+        ("hot",): "Гидравлический расчёт системы горячего водоснабжения по СП 30.13330.2020",
+    }
 
-    def save_results(self) -> None:
-        if not self.results:
-            messagebox.showwarning(self.TEXT["error"], self.TEXT["no_data"])
-            return
-        
-        file_path = tk.filedialog.asksaveasfilename(
-            defaultextension=".csv",
-            filetypes=[ft.value for ft in FileType],
-            title="Сохранить результаты"
-        )
-        
-        if not file_path:
-            messagebox.showwarning(self.TEXT["file_not_saved"], self.TEXT["file_not_saved"])
-            return
-        
-        try:
-            extension = file_path.split('.')[-1].lower()
-            if extension == 'csv':
-                self._save_to_csv(file_path)
-            elif extension == 'xlsx':
-                self._save_to_excel(file_path)
-            elif extension == 'docx':
-                self._save_to_docx(file_path)
-            else:
-                messagebox.showerror(self.TEXT["error"], "Неподдерживаемый формат файла")
-                return
-                
-            messagebox.showinfo(self.TEXT["success"], f"Файл успешно сохранён: {file_path}")
-        except Exception as e:
-            messagebox.showerror(self.TEXT["error"], f"Ошибка при сохранении: {str(e)}")
-
-    def _save_to_csv(self, file_path: str) -> None:
-        with open(file_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(self.RESULT_HEADERS)
-            for result in self.results:
-                writer.writerow([
-                    result.t, result.U, result.D, result.q_chru, result.q_c0,
-                    result.group, result.consumer, result.PcN,
-                    result.alpha, result.Q, result.velocity
-                ])
-
-    def _save_to_excel(self, file_path: str) -> None:
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Результаты расчёта"
-        ws.append(self.RESULT_HEADERS)
-        
-        for result in self.results:
-            ws.append([
-                result.t, result.U, result.D, result.q_chru, result.q_c0,
-                result.group, result.consumer, result.PcN,
-                result.alpha, result.Q, result.velocity
-            ])
-            
-        wb.save(file_path)
+    SYSTEM_NAMES = {
+        "cold": "ХВС",
+        "hot": "ГВС",
+        "total": "Общий расход",
+    }
 
-    def _save_to_docx(self, file_path: str) -> None:
-        doc = Document()
-        doc.add_heading(f"Результаты расчёта: {self.current_consumer}", level=1)
-        
-        table = doc.add_table(rows=1, cols=len(self.RESULT_HEADERS))
-        table.style = 'Table Grid'
-        
-        for i, header in enumerate(self.RESULT_HEADERS):
-            table.cell(0, i).text = header
-            
-        for result in self.results:
-            row = table.add_row().cells
-            values = [
-                str(result.t), str(result.U), str(result.D), str(result.q_chru),
-                str(result.q_c0), str(result.group), result.consumer,
-                f"{result.PcN:.4f}", f"{result.alpha:.4f}", 
-                f"{result.Q:.4f}", f"{result.velocity:.4f}"
-            ]
-            for i, value in enumerate(values):
-                row[i].text = value
-                
-        doc.save(file_path)
-        
-    def load_imported_data(self, data):
-        """Загружает импортированные данные в интерфейс"""
-        # Сначала очищаем существующие участки
-        while len(self.entries) > 1:
-            self.remove_section(self.entries[0][2])
-    
-        # Добавляем участки из импортированных данных
-        for item in data:
-            self.add_section()
-            last_idx = len(self.entries) - 1
-            self.entries[last_idx][0].delete(0, tk.END)  # очищаем поле U
-            self.entries[last_idx][0].insert(0, str(item['U']))  # заполняем U
-        
-            # Устанавливаем диаметр, если он есть в данных
-            if 'D' in item:
-                self.entries[last_idx][1].set(str(int(item['D'])))
-        
-            # Устанавливаем номер участка (t), если есть поле ввода
-            if hasattr(self, 't_entry'):
-                self.t_entry.delete(0, tk.END)
-                self.t_entry.insert(0, str(item.get('t', '')))
-    
-    def validate_import_data(self, data):
-        """Проверяет корректность импортированных данных"""
-        validated = []
-        for item in data:
-            try:
-                validated.append({
-                    't': float(item['t']),
-                    'U': float(item['U']),
-                    'D': int(item['D'])
-                })
-            except (ValueError, KeyError):
-                continue
-        return validated
-
-class HotWaterCalculator:
-    RESULT_HEADERS = [
-        "t", "U", "D", "q_(h)hru", "q_(h)0", 
-        "Группа (t_num)", "Потребитель", 
-        "Ph*N", "alpha", "Q", "Скорость"
-    ]
-    
     TEXT = {
-        "title": "Гидравлический расчёт системы горячего водоснабжения по СП 30.13330.2020",
+        "title": "Гидравлический расчёт систем холодного и горячего водоснабжения по СП 30.13330.2020",
         "consumer_label": "СП 30.13330",
         "t_entry_default": "Введите номер потребителя",
-        "u_entry_default": "Введите U",
-        "add_section": "➕ Добавить участок",
-        "delete_section": "❌ Удалить участок",
         "calculate": "▶️ Рассчитать",
+        "live": "Пересчитывать при вводе",
+        "live_status": "Пересчитано участков: {} из {}",
+        "velocity_from": "Скорость, м/с: от",
+        "velocity_to": "до",
+        "select_diameters": "📏 Подобрать диаметры",
+        "invalid_velocity": "Введите пределы скорости числами.",
+        "diameters_selected": "Диаметры подобраны, изменено участков: {} из {}.",
         "show_results": "↪️ Результаты расчёта",
         "save_results": "⏫ Сохранить результаты",
         "success": "Успех",
@@ -464,29 +422,35 @@ class HotWaterCalculator:
         "file_not_saved": "Файл не сохранён.",
         "calculation_success": "Расчёт выполнен успешно.",
         "no_data": "Нет данных для отображения.",
-        "invalid_t": "Введите корректное значение для t.",
+        "invalid_t": "Введите тип потребителя.",
         "t_not_found": "Значение t={} не найдено в массиве.",
-        "section_error": "Ошибка в расчётах участка: {}",
         "interpolation_error": "Не удалось выполнить интерполяцию.",
         "velocity_error": "Не удалось вычислить значение скорости."
     }
 
-    def __init__(self, master: tk.Tk):
+    def __init__(self, master: tk.Tk, systems: Tuple[str, ...] = ("cold",)):
         self.master = master
+        self.systems = tuple(systems)
         self.current_consumer_data = None
-        self.master.title(self.TEXT["title"])
+        self.master.title(self.TITLES.get(self.systems, self.TEXT["title"]))
         self.master.minsize(800, 600)
         
-        self.entries = []
-        self.results = []
+        self.sections = SectionStore()
+        self.sections.append()
+        self.calculation = IncrementalCalculation(self.sections, self.systems)
+        self.results: Dict[str, List[CalculationResult]] = {}
+        self.result_ids: List[int] = []
+        self.results_stale = False
+        self.result_trees: List[Tuple[ttk.Treeview, str]] = []
         self.current_consumer = ""
+        self.live = tk.BooleanVar(master, value=False)
+        self.live_job = None
         
         self._setup_ui()
-        self.add_section()
 
     def _setup_ui(self) -> None:
         self._create_input_panel()
-        self._create_scrollable_area()
+        self._create_section_editor()
       
     def _create_input_panel(self) -> None:
         input_frame = ttk.Frame(self.master, padding="10")
@@ -502,6 +466,7 @@ class HotWaterCalculator:
         self.t_entry = ttk.Entry(input_frame)
         self.t_entry.pack(side=tk.LEFT, padx=5, expand=True, fill=tk.X)
         self.t_entry.insert(0, self.TEXT["t_entry_default"])
+        self.t_entry.bind("<KeyRelease>", lambda e: self.on_sections_changed())
         
         buttons = [
             (self.TEXT["calculate"], self.calculate),
@@ -514,201 +479,160 @@ class HotWaterCalculator:
                 input_frame, text=text, command=command
             ).pack(side=tk.LEFT, padx=5)
 
+        live_frame = ttk.Frame(self.master, padding=(10, 0))
+        live_frame.pack(fill=tk.X)
+        ttk.Checkbutton(
+            live_frame, text=self.TEXT["live"], variable=self.live,
+            command=self.on_sections_changed
+        ).pack(side=tk.LEFT, padx=5)
+        self.status = ttk.Label(live_frame, text="")
+        self.status.pack(side=tk.LEFT, padx=5)
+
+        limits = engine.VelocityLimits()
+        ttk.Button(
+            live_frame, text=self.TEXT["select_diameters"], command=self.select_diameters
+        ).pack(side=tk.RIGHT, padx=5)
+        self.v_max_entry = ttk.Entry(live_frame, width=6)
+        self.v_max_entry.insert(0, str(limits.v_max))
+        self.v_max_entry.pack(side=tk.RIGHT)
+        ttk.Label(live_frame, text=self.TEXT["velocity_to"]).pack(side=tk.RIGHT, padx=5)
+        self.v_min_entry = ttk.Entry(live_frame, width=6)
+        self.v_min_entry.insert(0, str(limits.v_min))
+        self.v_min_entry.pack(side=tk.RIGHT)
+        ttk.Label(live_frame, text=self.TEXT["velocity_from"]).pack(side=tk.RIGHT, padx=5)
+
     def open_load_calculator(self):
         try:
             if not self.current_consumer_data:
-                raise ValueError("Сначала выполните расчёт потребителя")
+                raise ValueError("Сначала выполните гидравлический расчёт")
                 
             LoadCalculator(self.master, self.current_consumer_data)
         except ValueError as e:
             messagebox.showerror("Ошибка", str(e))
 
-    def _create_scrollable_area(self) -> None:
-        container = ttk.Frame(self.master)
-        container.pack(fill=tk.BOTH, expand=True)
-        
-        self.canvas = tk.Canvas(container)
-        scrollbar_y = ttk.Scrollbar(container, orient="vertical", command=self.canvas.yview)
-        scrollbar_x = ttk.Scrollbar(container, orient="horizontal", command=self.canvas.xview)
-        
-        self.scrollable_frame = ttk.Frame(self.canvas)
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar_y.set)
-        self.canvas.configure(xscrollcommand=scrollbar_x.set)
-        
-        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar_y.pack(side=tk.RIGHT, fill=tk.Y)
-        scrollbar_x.pack(side=tk.BOTTOM, fill=tk.X)
-
-    def add_section(self, after_frame: Optional[tk.Frame] = None) -> None:
-        new_frame = ttk.Frame(self.scrollable_frame, padding="5")
-    
-        u_entry = ttk.Entry(new_frame)
-        u_entry.pack(side=tk.LEFT, padx=5)
-        u_entry.insert(0, self.TEXT["u_entry_default"])
-
-        diam_values = [d for d in data.diam_values if d > 0]
-        diam_str_values = [str(int(d)) for d in diam_values]
-    
-        diam_var = StringVar(value=diam_str_values[0])
-        diam_menu = ttk.OptionMenu(
-            new_frame, 
-            diam_var, 
-            diam_str_values[0],
-            *diam_str_values
-        )
-        diam_menu.pack(side=tk.LEFT, padx=5)
-
-        ttk.Button(
-            new_frame, text=self.TEXT["add_section"],
-            command=lambda: self.add_section(new_frame)
-        ).pack(side=tk.LEFT, padx=5)
-    
-        ttk.Button(
-            new_frame, text=self.TEXT["delete_section"],
-            command=lambda: self.remove_section(new_frame)
-        ).pack(side=tk.LEFT, padx=5)
-
-        if after_frame:
-            for i, (_, _, frame) in enumerate(self.entries):
-                if frame == after_frame:
-                    self.entries.insert(i+1, (u_entry, diam_var, new_frame))
-                    new_frame.pack(in_=self.scrollable_frame, after=after_frame)
-                    break
-        else:
-            self.entries.append((u_entry, diam_var, new_frame))
-            new_frame.pack(in_=self.scrollable_frame)
-
-    def remove_section(self, frame: tk.Frame) -> None:
-        if len(self.entries) <= 1:
-            messagebox.showwarning(self.TEXT["error"], "Нельзя удалить последний участок")
-            return
-            
-        frame.destroy()
-        self.entries = [entry for entry in self.entries if entry[2] != frame]
+    def _create_section_editor(self) -> None:
+        self.editor = SectionEditor(self.master, self.sections, on_change=self.on_sections_changed, padding="5")
+        self.editor.pack(fill=tk.BOTH, expand=True)
+        self.editor.refresh()
 
     def calculate(self) -> None:
-        self.results.clear()
+        self.results = {}
         
         try:
-            t_input = self._validate_t_input()
-            index, params = self._get_consumer_params(t_input)
-            
-            self.current_consumer_data = {
-                't_input': t_input,
-                'index': index,
-                'params': params,
-                'q_tot_hru': data.q_tot_hru_values[index],
-                'q_h_hru': data.q_h_hru_values[index],
-                'q_c_hru': data.q_c_hru_values[index],
-                'q_tot': data.q_tot_values[index],
-                'q_h': data.q_h_values[index],
-                'q_c': data.q_c_values[index],
-                'q_tot_0': data.q_tot_0_values[index],
-                'q_h_0': data.q_h_0_values[index],
-                'q_c_0': data.q_c_0_values[index],
-                'q_tot_0_hr': data.q_tot_0_hr_values[index],
-                'q_h_0_hr': data.q_h_0_hr_values[index],
-                'q_c_0_hr': data.q_c_0_hr_values[index],
-                'consumer_name': params[3]
-            }
-            self.current_consumer = params[3]
-            
-            for u_entry, diam_var, _ in self.entries:
-                result = self._calculate_section(u_entry, diam_var, t_input, *params)
-                self.results.append(result)
-                
+            self._recalculate(self._default_t())
+            self._collect_results()
             messagebox.showinfo(self.TEXT["success"], self.TEXT["calculation_success"])
         except ValueError as e:
             messagebox.showerror(self.TEXT["error"], str(e))
 
+    def _recalculate(self, t_default: Optional[float]) -> List[int]:
+        """Пересчитывает изменённые участки; списки results собираются позже, по требованию"""
+        try:
+            updated = self.calculation.update(t_default)
+        except ValueError:
+            # Не все участки посчитаны: остаются списки прошлого успешного расчёта
+            self.results_stale = False
+            raise
+
+        # Расчёт нагрузок ведётся по общему потребителю, а если он не задан - по первому участку
+        first_id = int(self.sections.ids()[0])
+        t_load = t_default if t_default is not None else float(self.calculation.results[first_id][0].t)
+        self.current_consumer_data = engine.build_consumer_data(t_load, self.systems[0])
+        self.results_stale = True
+        return updated
+
+    def _collect_results(self) -> None:
+        self.results = self.calculation.result_lists()
+        self.result_ids = self.sections.ids().tolist()
+        first = self.results[self.systems[0]]
+        self.current_consumer = "; ".join(dict.fromkeys(str(result.consumer) for result in first))
+        self.results_stale = False
+
+    def _current_results(self) -> Dict[str, List[CalculationResult]]:
+        """Результаты последнего расчёта (после пересчёта при вводе списки собираются заново)"""
+        if self.results_stale:
+            self._collect_results()
+        return self.results
+
+    def on_sections_changed(self) -> None:
+        """Изменились участки или общий тип потребителя: при включённом флажке - отложенный пересчёт"""
+        if not self.live.get() or self.live_job is not None:
+            return
+        # Пересчёт после обработки всех событий: серия правок даёт один пересчёт
+        self.live_job = self.master.after_idle(self._live_update)
+
+    def _live_update(self) -> None:
+        self.live_job = None
+        try:
+            updated = self._recalculate(self._default_t())
+        except ValueError as e:
+            # При вводе ошибки (например, ещё не заданное U) не прерывают работу окном
+            self.status.configure(text=str(e))
+            return
+        self.status.configure(text=self.TEXT["live_status"].format(len(updated), len(self.sections)))
+        self._update_result_trees(updated)
+
+    def _update_result_trees(self, updated: List[int]) -> None:
+        """Обновляет открытые таблицы результатов: только пересчитанные строки, если состав участков не менялся"""
+        self.result_trees = [(tree, system) for tree, system in self.result_trees if tree.winfo_exists()]
+        if not self.result_trees:
+            return
+        index = self.systems.index
+        for tree, system in self.result_trees:
+            same_rows = len(tree.get_children()) == len(self.sections) and all(
+                tree.exists(str(row_id)) for row_id in updated
+            )
+            if not same_rows:
+                self._fill_results_table(tree, system)
+                continue
+            k = index(system)
+            for row_id in updated:
+                tree.item(str(row_id), values=self._result_values(self.calculation.results[row_id][k]))
+
     def _validate_t_input(self) -> float:
         try:
             t_input = float(self.t_entry.get())
-            if t_input not in data.t_values:
+            if t_input not in lookup.CONSUMERS:
                 raise ValueError(self.TEXT["t_not_found"].format(t_input))
             return t_input
         except ValueError:
             raise ValueError(self.TEXT["invalid_t"])
 
-    def _get_consumer_params(self, t_input: float) -> Tuple[int, Tuple[float, float, int, str]]:
-        index = np.where(data.t_values == t_input)[0][0]
-        return index, (
-            data.q_h_hru_values[index],  # Используем q_h_hru вместо q_c_hru
-            data.q_h_0_values[index],    # Используем q_h_0 вместо q_c_0
-            data.t_num_values[index],
-            data.t_string_values[index]
-        )
-
-    def _calculate_section(self, u_entry: tk.Entry, diam_var: StringVar, 
-                          t_input: float, q_h_hru: float, q_h_0: float, 
-                          t_num: int, t_string: str) -> CalculationResult:
+    def _default_t(self) -> Optional[float]:
+        """Общий тип потребителя или None, если он не задан"""
         try:
-            U = float(u_entry.get())
-            D = int(diam_var.get())
-            v_values = data.v_dict[D]
-
-            x_input = (q_h_hru * U) / (3600 * q_h_0)  # Используем параметры горячей воды
-            alpha = self._interpolate(x_input, data.x_values, data.y_values)
-            Q = 5 * q_h_0 * alpha  # Используем q_h_0 вместо q_c_0
-            velocity = self._interpolate_velocity(Q, v_values)
-
-            return CalculationResult(
-                t=t_input, U=U, D=D, 
-                q_chru=q_h_hru,  # Используем q_h_hru вместо q_c_hru
-                q_c0=q_h_0,      # Используем q_h_0 вместо q_c_0
-                group=t_num, 
-                consumer=t_string, 
-                PcN=x_input,
-                alpha=alpha, 
-                Q=Q, 
-                velocity=velocity
-            )
-        except ValueError as e:
-            raise ValueError(self.TEXT["section_error"].format(str(e)))
+            return self._validate_t_input()
+        except ValueError:
+            return None
 
-    def _interpolate_velocity(self, Q: float, v_values: List[float]) -> float:
-        q_values = data.q_values
+    def _velocity_limits(self) -> engine.VelocityLimits:
         try:
-            if Q < q_values[0]:
-                return self._linear_interpolation(Q, q_values[0], q_values[1], v_values[0], v_values[1])
-            if Q > q_values[-1]:
-                return self._linear_interpolation(Q, q_values[-2], q_values[-1], v_values[-2], v_values[-1])
-            
-            for i in range(len(q_values) - 1):
-                if q_values[i] <= Q <= q_values[i + 1]:
-                    return self._linear_interpolation(Q, q_values[i], q_values[i + 1], v_values[i], v_values[i + 1])
-        except IndexError:
-            pass
-            
-        raise ValueError(self.TEXT["velocity_error"])
+            return engine.VelocityLimits(
+                float(self.v_min_entry.get().replace(',', '.')),
+                float(self.v_max_entry.get().replace(',', '.'))
+            )
+        except ValueError:
+            raise ValueError(self.TEXT["invalid_velocity"])
 
-    @staticmethod
-    def _interpolate(x: float, x_values: List[float], y_values: List[float]) -> float:
+    def select_diameters(self) -> None:
+        """Подбирает всем участкам наименьший диаметр со скоростью в заданных пределах"""
         try:
-            if x < x_values[0]:
-                return HotWaterCalculator._linear_interpolation(x, x_values[0], x_values[1], y_values[0], y_values[1])
-            if x > x_values[-1]:
-                return HotWaterCalculator._linear_interpolation(x, x_values[-2], x_values[-1], y_values[-2], y_values[-1])
-            
-            for i in range(len(x_values) - 1):
-                if x_values[i] <= x <= x_values[i + 1]:
-                    return HotWaterCalculator._linear_interpolation(x, x_values[i], x_values[i + 1], y_values[i], y_values[i + 1])
-        except IndexError:
-            pass
-            
-        raise ValueError(HotWaterCalculator.TEXT["interpolation_error"])
+            limits = self._velocity_limits()
+            t, U, D = self.calculation.columns(self._default_t())
+            selected = engine.select_diameters(U, t, self.systems, limits)
+        except ValueError as e:
+            messagebox.showerror(self.TEXT["error"], str(e))
+            return
 
-    @staticmethod
-    def _linear_interpolation(x: float, x0: float, x1: float, y0: float, y1: float) -> float:
-        return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+        self.sections.set_column("D", selected)
+        self.editor.refresh()
+        self.on_sections_changed()
+        messagebox.showinfo(self.TEXT["success"], self.TEXT["diameters_selected"].format(
+            int(np.count_nonzero(selected != D)), len(D)
+        ))
 
     def show_results(self) -> None:
-        if not self.results:
+        if not self._current_results():
             messagebox.showwarning(self.TEXT["error"], self.TEXT["no_data"])
             return
         
@@ -722,21 +646,47 @@ class HotWaterCalculator:
             font=("Arial", 12, "bold")
         ).pack(pady=10)
 
-        tree = ttk.Treeview(results_window, columns=self.RESULT_HEADERS, show="headings")
+        if len(self.systems) == 1:
+            self._create_results_table(results_window, self.systems[0])
+            return
+
+        # Несколько потоков - по вкладке на каждый
+        notebook = ttk.Notebook(results_window)
+        notebook.pack(fill=tk.BOTH, expand=True)
+        for system in self.systems:
+            tab = ttk.Frame(notebook)
+            notebook.add(tab, text=self.SYSTEM_NAMES[system])
+            self._create_results_table(tab, system)
+
+    @staticmethod
+    def _result_values(result: CalculationResult) -> list:
+        return [
+            result.t, result.U, result.D, result.q_chru, result.q_c0,
+            result.group, result.consumer, round(result.PcN, 4),
+            round(result.alpha, 4), round(result.Q, 4), round(result.velocity, 4)
+        ]
+
+    def _fill_results_table(self, tree: ttk.Treeview, system: str) -> None:
+        """Строки таблицы результатов; iid строки - номер участка в SectionStore"""
+        results = self._current_results()[system]
+        tree.delete(*tree.get_children())
+        with PROFILER.stage("results_table"):
+            for row_id, result in zip(self.result_ids, results):
+                tree.insert("", tk.END, iid=str(row_id), values=self._result_values(result))
+
+    def _create_results_table(self, parent, system: str) -> None:
+        headers = export.RESULT_HEADERS[system]
+        tree = ttk.Treeview(parent, columns=headers, show="headings")
         
-        for header in self.RESULT_HEADERS:
+        for header in headers:
             tree.heading(header, text=header)
             tree.column(header, width=100, anchor=tk.CENTER)
         
-        for result in self.results:
-            tree.insert("", tk.END, values=[
-                result.t, result.U, result.D, result.q_chru, result.q_c0,
-                result.group, result.consumer, round(result.PcN, 4),
-                round(result.alpha, 4), round(result.Q, 4), round(result.velocity, 4)
-            ])
+        self._fill_results_table(tree, system)
+        self.result_trees.append((tree, system))
         
-        y_scroll = ttk.Scrollbar(results_window, orient="vertical", command=tree.yview)
-        x_scroll = ttk.Scrollbar(results_window, orient="horizontal", command=tree.xview)
+        y_scroll = ttk.Scrollbar(parent, orient="vertical", command=tree.yview)
+        x_scroll = ttk.Scrollbar(parent, orient="horizontal", command=tree.xview)
         tree.configure(yscrollcommand=y_scroll.set, xscrollcommand=x_scroll.set)
         
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -744,7 +694,7 @@ class HotWaterCalculator:
         x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
 
     def save_results(self) -> None:
-        if not self.results:
+        if not self._current_results():
             messagebox.showwarning(self.TEXT["error"], self.TEXT["no_data"])
             return
         
@@ -758,106 +708,55 @@ class HotWaterCalculator:
             messagebox.showwarning(self.TEXT["file_not_saved"], self.TEXT["file_not_saved"])
             return
         
-        try:
-            extension = file_path.split('.')[-1].lower()
-            if extension == 'csv':
-                self._save_to_csv(file_path)
-            elif extension == 'xlsx':
-                self._save_to_excel(file_path)
-            elif extension == 'docx':
-                self._save_to_docx(file_path)
-            else:
-                messagebox.showerror(self.TEXT["error"], "Неподдерживаемый формат файла")
-                return
-                
-            messagebox.showinfo(self.TEXT["success"], f"Файл успешно сохранён: {file_path}")
-        except Exception as e:
-            messagebox.showerror(self.TEXT["error"], f"Ошибка при сохранении: {str(e)}")
-
-    def _save_to_csv(self, file_path: str) -> None:
-        with open(file_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(self.RESULT_HEADERS)
-            for result in self.results:
-                writer.writerow([
-                    result.t, result.U, result.D, result.q_chru, result.q_c0,
-                    result.group, result.consumer, result.PcN,
-                    result.alpha, result.Q, result.velocity
-                ])
-
-    def _save_to_excel(self, file_path: str) -> None:
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Результаты расчёта"
-        ws.append(self.RESULT_HEADERS)
-        
-        for result in self.results:
-            ws.append([
-                result.t, result.U, result.D, result.q_chru, result.q_c0,
-                result.group, result.consumer, result.PcN,
-                result.alpha, result.Q, result.velocity
-            ])
-            
-        wb.save(file_path)
+        if export.file_extension(file_path) not in export.FORMATS:
+            messagebox.showerror(self.TEXT["error"], "Неподдерживаемый формат файла")
+            return
 
-    def _save_to_docx(self, file_path: str) -> None:
-        doc = Document()
-        doc.add_heading(f"Результаты расчёта: {self.current_consumer}", level=1)
-        
-        table = doc.add_table(rows=1, cols=len(self.RESULT_HEADERS))
-        table.style = 'Table Grid'
-        
-        for i, header in enumerate(self.RESULT_HEADERS):
-            table.cell(0, i).text = header
-            
-        for result in self.results:
-            row = table.add_row().cells
-            values = [
-                str(result.t), str(result.U), str(result.D), str(result.q_chru),
-                str(result.q_c0), str(result.group), result.consumer,
-                f"{result.PcN:.4f}", f"{result.alpha:.4f}", 
-                f"{result.Q:.4f}", f"{result.velocity:.4f}"
-            ]
-            for i, value in enumerate(values):
-                row[i].text = value
-                
-        doc.save(file_path)
+        # Фоновый поток получает копию: новый расчёт во время сохранения её не затронет
+        files = [(self._system_path(file_path, system), system, list(self.results[system]))
+                 for system in self.systems]
+        ExportTask(
+            self.master, partial(self._save_files, files, self.current_consumer),
+            sum(len(results) for _, _, results in files), [path for path, _, _ in files],
+            "Файл успешно сохранён: {}", "Ошибка при сохранении: {}"
+        )
 
-    def load_imported_data(self, data):
-        """Загружает импортированные данные в интерфейс"""
-        # Сначала очищаем существующие участки
-        while len(self.entries) > 1:
-            self.remove_section(self.entries[0][2])
-    
-        # Добавляем участки из импортированных данных
-        for item in data:
-            self.add_section()
-            last_idx = len(self.entries) - 1
-            self.entries[last_idx][0].delete(0, tk.END)  # очищаем поле U
-            self.entries[last_idx][0].insert(0, str(item['U']))  # заполняем U
-        
-            # Устанавливаем диаметр, если он есть в данных
-            if 'D' in item:
-                self.entries[last_idx][1].set(str(int(item['D'])))
-        
-            # Устанавливаем номер участка (t), если есть поле ввода
-            if hasattr(self, 't_entry'):
-                self.t_entry.delete(0, tk.END)
-                self.t_entry.insert(0, str(item.get('t', '')))
-    
-    def validate_import_data(self, data):
-        """Проверяет корректность импортированных данных"""
-        validated = []
-        for item in data:
-            try:
-                validated.append({
-                    't': float(item['t']),
-                    'U': float(item['U']),
-                    'D': int(item['D'])
-                })
-            except (ValueError, KeyError):
-                continue
-        return validated
+    def _system_path(self, file_path: str, system: str) -> str:
+        """При нескольких потоках каждый сохраняется в свой файл: имя_cold.xlsx, имя_hot.xlsx..."""
+        if len(self.systems) == 1:
+            return file_path
+        name, extension = os.path.splitext(file_path)
+        return f"{name}_{system}{extension}"
+
+    @staticmethod
+    def _report_progress(progress: Callable[[int], None], count: int, offset: int = 0) -> None:
+        progress(offset + count)
+
+    @classmethod
+    def _save_files(cls, files: List[Tuple[str, str, List[CalculationResult]]], consumer: str,
+                    progress: export.Progress = None) -> None:
+        written = 0
+        for file_path, system, results in files:
+            # Прогресс считается по всем файлам сразу
+            file_progress = None if progress is None else partial(cls._report_progress, progress, offset=written)
+            with export.atomic_output(file_path) as temp_path:
+                export.save_sections(temp_path, results, export.RESULT_HEADERS[system], consumer, file_progress)
+            written += len(results)
+        
+    def load_imported_data(self, store: SectionStore):
+        """Загружает импортированные участки в интерфейс"""
+        if not len(store):
+            return
+
+        # Тип потребителя (t) задаётся для каждого участка отдельно
+        self.sections.replace_columns(*store.columns())
+        self.editor.reset()
+        self.on_sections_changed()
+
+        # Общий тип потребителя - по первому участку, он используется в расчёте нагрузок
+        if hasattr(self, 't_entry'):
+            self.t_entry.delete(0, tk.END)
+            self.t_entry.insert(0, str(store.rows(0, 1)[0][1]))
 
 class LoadCalculator:
     TEXT = {
@@ -871,6 +770,7 @@ class LoadCalculator:
     def __init__(self, master, consumer_data):
         self.top = tk.Toplevel(master)
         self.consumer_data = consumer_data
+        self.results: List[engine.LoadResult] = []
         self.top.title(self.TEXT["title"])
         self.top.geometry("900x600")
         
@@ -940,103 +840,13 @@ class LoadCalculator:
             
             for item in self.tree.get_children():
                 self.tree.delete(item)
+            self.results = []
                 
             if self.consumer_data:
-                idx = self.consumer_data['index']
-                
-                results = [
-                    ("Секундная вероятность действия приборов обшая (P_tot*N)", 
-                     (self.consumer_data['q_tot_hru'] * U) / (3600 * self.consumer_data['q_tot_0']), 
-                     "-"),
-                    ("Секундная вероятность действия приборов на ГВС (P_h*N)", 
-                     (self.consumer_data['q_h_hru'] * U) / (3600 * self.consumer_data['q_h_0']), 
-                     "-"),
-                    ("Секундная вероятность действия приборов на ХВС (P_c*N)", 
-                     (self.consumer_data['q_c_hru'] * U) / (3600 * self.consumer_data['q_c_0']), 
-                     "-"),
-
-                    ("Альфа секундная общая (a_tot)", 
-                     self._calculate_alpha(self.consumer_data['q_tot_hru'], self.consumer_data['q_tot_0'], U), 
-                     "-"),
-                    ("Альфа секундная на ГВС (a_h)", 
-                     self._calculate_alpha(self.consumer_data['q_h_hru'], self.consumer_data['q_h_0'], U), 
-                     "-"),
-                    ("Альфа секундная на ХВС (a_c)", 
-                     self._calculate_alpha(self.consumer_data['q_c_hru'], self.consumer_data['q_c_0'], U), 
-                     "-"),
-
-                    ("Расчётный секундный расход общий (q_tot)", 
-                     5 * self.consumer_data['q_tot_0'] * self._calculate_alpha(self.consumer_data['q_tot_hru'], self.consumer_data['q_tot_0'], U), 
-                     "л/с"),
-                    ("Расчётный секундный расход на ГВС (q_h)", 
-                     5 * self.consumer_data['q_h_0'] * self._calculate_alpha(self.consumer_data['q_h_hru'], self.consumer_data['q_h_0'], U), 
-                     "л/с"),
-                    ("Расчётный секундный расход на ХВС (q_c)", 
-                     5 * self.consumer_data['q_c_0'] * self._calculate_alpha(self.consumer_data['q_c_hru'], self.consumer_data['q_c_0'], U), 
-                     "л/с"),
-                     
-                    ("Часовая вероятность действия приборов общая (P_tot*N)", 
-                     self.consumer_data['q_tot_hru'] * U / self.consumer_data['q_tot_0_hr'], 
-                     "-"),
-                    ("Часовая вероятность действия приборов на ГВС(P_h*N)", 
-                     self.consumer_data['q_h_hru'] * U / self.consumer_data['q_h_0_hr'], 
-                     "-"),
-                    ("Часовая вероятность действия приборов на ХВС (P_c*N)", 
-                     self.consumer_data['q_c_hru'] * U / self.consumer_data['q_c_0_hr'], 
-                     "-"),
-
-                    ("Альфа часовая общая (a_tot_hr)", 
-                     self._calculate_alpha_h(self.consumer_data['q_tot_hru'], self.consumer_data['q_tot_0_hr'], U), 
-                     "-"),
-                    ("Альфа часовая на ГВС(a_h_hr)", 
-                     self._calculate_alpha_h(self.consumer_data['q_h_hru'], self.consumer_data['q_h_0_hr'], U), 
-                     "-"),
-                    ("Альфа часовая на ХВС (a_c_hr)", 
-                     self._calculate_alpha_h(self.consumer_data['q_c_hru'], self.consumer_data['q_c_0_hr'], U), 
-                     "-"),
-                     
-                    ("Часовой расход общий (q_tot_hr)", 
-                     0.005 * self.consumer_data['q_tot_0_hr'] * self._calculate_alpha_h(self.consumer_data['q_tot_hru'], self.consumer_data['q_tot_0_hr'], U), 
-                     "м³/ч"),
-                    ("Часовой расход на ГВС (q_h_hr)", 
-                     0.005 * self.consumer_data['q_h_0_hr'] * self._calculate_alpha_h(self.consumer_data['q_h_hru'], self.consumer_data['q_h_0_hr'], U), 
-                     "м³/ч"),
-                    ("Часовой расход на ХВС (q_c_hr)", 
-                     0.005 * self.consumer_data['q_c_0_hr'] * self._calculate_alpha_h(self.consumer_data['q_c_hru'], self.consumer_data['q_c_0_hr'], U), 
-                     "м³/ч"),
-                     
-                    ("Суточный расход общий (Q_сут_tot)", 
-                     self.consumer_data['q_tot'] * U / 1000, 
-                     "м³/сут"),
-                    ("Суточный расход на ГВС (Q_сут_h)", 
-                     self.consumer_data['q_h'] * U / 1000, 
-                     "м³/сут"),
-                    ("Суточный расход на ХВС (Q_сут_c)", 
-                     self.consumer_data['q_c'] * U / 1000, 
-                     "м³/сут"),
-                     
-                    ("Расход тепла на ГВС максимальный (Q(h,hr))", 
-                     1.16 * (0.005 * self.consumer_data['q_h_0_hr'] * self._calculate_alpha_h(self.consumer_data['q_h_hru'], self.consumer_data['q_h_0_hr'], U)) * (t_h - t_c) + 0.4 * (0.005 * self.consumer_data['q_h_0_hr'] * self._calculate_alpha_h(self.consumer_data['q_h_hru'], self.consumer_data['q_h_0_hr'], U)), 
-                     "кВт"),
-
-                    ("Расход тепла на ГВС максимальный (Q(h,hr))", 
-                     0.0008598452*(1.16 * (0.005 * self.consumer_data['q_h_0_hr'] * self._calculate_alpha_h(self.consumer_data['q_h_hru'], self.consumer_data['q_h_0_hr'], U)) * (t_h - t_c) + 0.4 * (0.005 * self.consumer_data['q_h_0_hr'] * self._calculate_alpha_h(self.consumer_data['q_h_hru'], self.consumer_data['q_h_0_hr'], U))), 
-                     "Гкал/ч"),
-
-                    #Q(h,T) = 1,16 × q(h,T) × (t(h) – t(с)) + Q(ht) 
-                    #q(h,T) = qh_u,m × Ui/(1000 × T)
-
-                    ("Расход тепла на ГВС средний (Q(h,T))", 
-                     1.16 * (self.consumer_data['q_h'] * U/(1000 * T)) * (t_h - t_c) + 0.4 * (0.005 * self.consumer_data['q_h_0_hr'] * self._calculate_alpha_h(self.consumer_data['q_h_hru'], self.consumer_data['q_h_0_hr'], U)), 
-                     "кВт"),
-
-                    ("Расход тепла на ГВС средний (Q(h,T))", 
-                    0.0008598452*(1.16 * (self.consumer_data['q_h'] * U/(1000 * T)) * (t_h - t_c) + 0.4 * (0.005 * self.consumer_data['q_h_0_hr'] * self._calculate_alpha_h(self.consumer_data['q_h_hru'], self.consumer_data['q_h_0_hr'], U))), 
-                     "Гкал/ч"),
-                ]
+                self.results = engine.calculate_load(self.consumer_data, U, t_h, t_c, T)
                 
-                for param, value, unit in results:
-                    self.tree.insert("", "end", values=(param, f"{value:.4f}", unit))
+                for result in self.results:
+                    self.tree.insert("", "end", values=(result.parameter, f"{result.value:.4f}", result.unit))
                     
             else:
                 messagebox.showerror("Ошибка", "Нет данных о потребителе")
@@ -1044,39 +854,8 @@ class LoadCalculator:
         except ValueError as e:
             messagebox.showerror("Ошибка", f"Некорректный ввод: {str(e)}")
 
-    @staticmethod
-    def _interpolate(x: float, x_values: List[float], y_values: List[float]) -> float:
-        try:
-            if x < x_values[0]:
-                return LoadCalculator._linear_interpolation(x, x_values[0], x_values[1], y_values[0], y_values[1])
-            if x > x_values[-1]:
-                return LoadCalculator._linear_interpolation(x, x_values[-2], x_values[-1], y_values[-2], y_values[-1])
-            
-            for i in range(len(x_values) - 1):
-                if x_values[i] <= x <= x_values[i + 1]:
-                    return LoadCalculator._linear_interpolation(x, x_values[i], x_values[i + 1], y_values[i], y_values[i + 1])
-        except IndexError:
-            pass
-            
-        raise ValueError(LoadCalculator.TEXT["interpolation_error"])
-
-    @staticmethod
-    def _linear_interpolation(x: float, x0: float, x1: float, y0: float, y1: float) -> float:
-        return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
-
-    #секундная альфа
-    def _calculate_alpha(self, q_hru, q_0, U):
-        x = (q_hru * U) / (3600 * q_0)
-        return ConsumerCalculator._interpolate(x, data.x_values, data.y_values)
-    
-    #часовая альфа
-    def _calculate_alpha_h(self, q_hru, q_0, U):
-        x = (q_hru * U) / (q_0)
-#        return x
-        return LoadCalculator._interpolate(x, data.x_values, data.y_values)
-    
     def save_results(self):
-        """Сохраняет результаты расчётов в файл (DOCX, CSV или Excel)"""
+        """Сохраняет результаты расчётов в файл (DOCX, CSV, Excel или NPZ)"""
         if not hasattr(self, 'tree') or not self.tree.get_children():
             messagebox.showerror("Ошибка", "Нет данных для сохранения")
             return
@@ -1091,108 +870,36 @@ class LoadCalculator:
         if not file_path:  # Пользователь отменил сохранение
             return
 
-        try:
-            # Собираем данные из Treeview
-            data = []
-            for item in self.tree.get_children():
-                values = self.tree.item(item, 'values')
-                data.append({
-                    "parameter": values[0],
-                    "value": values[1],
-                    "unit": values[2]
-                })
-
-            # Определяем расширение файла
-            extension = file_path.split('.')[-1].lower()
-
-            if extension == 'docx':
-                self._save_to_docx(file_path, data)
-            elif extension == 'csv':
-                self._save_to_csv(file_path, data)
-            elif extension == 'xlsx':
-                self._save_to_excel(file_path, data)
-            else:
-                messagebox.showerror("Ошибка", "Неподдерживаемый формат файла")
-                return
-
-            messagebox.showinfo("Успех", f"Файл успешно сохранён:\n{file_path}")
+        # Строки те же, что в таблице окна; для npz в них есть и значения без округления
+        data = export.load_rows(self.results)
 
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Ошибка при сохранении файла:\n{str(e)}")
+        if export.file_extension(file_path) not in export.FORMATS:
+            messagebox.showerror("Ошибка", "Неподдерживаемый формат файла")
+            return
 
-    def _save_to_docx(self, file_path, data):
-        """Сохраняет результаты в документ Word"""
-        doc = Document()
-    
-        # Добавляем заголовок
-        doc.add_heading('Результаты расчёта нагрузок', level=1)
-    
-        # Добавляем таблицу
-        table = doc.add_table(rows=1, cols=3)
-        table.style = 'Table Grid'
-    
-        # Заголовки таблицы
-        hdr_cells = table.rows[0].cells
-        hdr_cells[0].text = 'Параметр'
-        hdr_cells[1].text = 'Значение'
-        hdr_cells[2].text = 'Ед. изм.'
-    
-        # Данные таблицы
-        for item in data:
-            row_cells = table.add_row().cells
-            row_cells[0].text = item['parameter']
-            row_cells[1].text = item['value']
-            row_cells[2].text = item['unit']
-    
-        doc.save(file_path)
+        ExportTask(
+            self.top, partial(self._save_file, file_path, data), len(data), [file_path],
+            "Файл успешно сохранён:\n{}", "Ошибка при сохранении файла:\n{}"
+        )
 
-    def _save_to_csv(self, file_path, data):
-        """Сохраняет результаты в CSV файл"""
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Параметр', 'Значение', 'Ед. изм.']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        
-            writer.writeheader()
-            for item in data:
-                writer.writerow({
-                    'Параметр': item['parameter'],
-                    'Значение': item['value'],
-                    'Ед. изм.': item['unit']
-                })
-
-    def _save_to_excel(self, file_path, data):
-        """Сохраняет результаты в Excel файл"""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Результаты расчёта"
-    
-        # Заголовки
-        ws.append(['Параметр', 'Значение', 'Ед. изм.'])
-    
-        # Данные
-        for item in data:
-            ws.append([item['parameter'], item['value'], item['unit']])
-    
-        # Автоподбор ширины столбцов
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = (max_length + 2) * 1.2
-            ws.column_dimensions[column_letter].width = adjusted_width
-    
-        wb.save(file_path)
+    @staticmethod
+    def _save_file(file_path: str, data: List[Dict[str, Any]], progress: export.Progress = None) -> None:
+        with export.atomic_output(file_path) as temp_path:
+            export.save_load(temp_path, data, progress)
 
 class MainApplication:
+    # Выбор в окне -> потоки, которые считаются в калькуляторе участков
+    SYSTEMS = {
+        "cold": ("cold",),
+        "hot": ("hot",),
+        "combined": ("cold", "hot", "total"),
+    }
+
     def __init__(self, root):
         self.root = root
         self.root.title("Гидравлический расчёт СП 30.13330.2020")
         self.system_type = tk.StringVar(value="cold")
+        self.profiling = tk.BooleanVar(value=False)
         
         self._create_interface()
     
@@ -1208,14 +915,56 @@ class MainApplication:
         ttk.Label(system_frame, text="Тип системы:").pack(side=tk.LEFT)
         ttk.Radiobutton(system_frame, text="ХВС", variable=self.system_type, value="cold").pack(side=tk.LEFT, padx=5)
         ttk.Radiobutton(system_frame, text="ГВС", variable=self.system_type, value="hot").pack(side=tk.LEFT)
+        ttk.Radiobutton(system_frame, text="ХВС+ГВС", variable=self.system_type, value="combined").pack(side=tk.LEFT, padx=5)
         
         # Кнопки
         ttk.Button(control_frame, text="⏬ Импорт из Excel", command=self.import_from_excel).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="⏩ Запустить расчёт", command=self.launch_calculator).pack(side=tk.LEFT)
+
+        # Профилирование этапов расчёта (см. profiling.py)
+        ttk.Checkbutton(
+            control_frame, text="Профилирование", variable=self.profiling, command=self.toggle_profiling
+        ).pack(side=tk.LEFT, padx=(15, 5))
+        ttk.Button(control_frame, text="📊 Профиль", command=self.show_profile).pack(side=tk.LEFT)
+
+    def toggle_profiling(self):
+        if self.profiling.get():
+            PROFILER.enable(cprofile=True)
+        else:
+            PROFILER.disable()
+
+    def show_profile(self):
+        window = Toplevel(self.root)
+        window.title("Профиль расчёта")
+        window.minsize(700, 400)
+
+        text = tk.Text(window, wrap=tk.NONE, font=("Courier", 10))
+        text.insert("1.0", PROFILER.summary())
+        text.configure(state=tk.DISABLED)
+
+        buttons = ttk.Frame(window, padding="5")
+        buttons.pack(side=tk.BOTTOM, fill=tk.X)
+        ttk.Button(buttons, text="Сохранить", command=self.save_profile).pack(side=tk.RIGHT)
+        ttk.Button(buttons, text="Сбросить", command=PROFILER.reset).pack(side=tk.RIGHT, padx=5)
+        text.pack(fill=tk.BOTH, expand=True)
+
+    def save_profile(self):
+        file_path = tk.filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[("Text files", "*.txt"), ("JSON files", "*.json"), ("cProfile data", "*.prof")],
+            title="Сохранить профиль"
+        )
+        if not file_path:
+            return
+        try:
+            PROFILER.dump(file_path)
+            messagebox.showinfo("Успех", f"Профиль сохранён: {file_path}")
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить профиль:\n{str(e)}")
     
     def import_from_excel(self):
         file_path = tk.filedialog.askopenfilename(
-            filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")],
+            filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv"), ("All files", "*.*")],
             title="Выберите файл Excel с данными"
         )
         
@@ -1223,36 +972,18 @@ class MainApplication:
             return
             
         try:
-            import openpyxl
-            wb = openpyxl.load_workbook(file_path)
-            sheet = wb.active
-            
-            # Формат таблицы:
-            # Колонка A - номера типа потребителя
-            # Колонка B - значения U (количество приборов)
-            # Колонка C - диаметры D
-            
-            data = []
-            for row in sheet.iter_rows(min_row=2, values_only=True):  # пропускаем заголовок
-                if row[0] and row[1] and row[2]:  # если все три значения есть
-                    data.append({
-                        't': row[0],  # номер типа потребителя
-                        'U': row[1],  # количество приборов
-                        'D': row[2]   # диаметр
-                    })
+            store = importer.read_store(file_path)
             
             # Сохраняем данные для передачи в калькулятор
-            self.imported_data = data
-            messagebox.showinfo("Успех", f"Успешно загружено {len(data)} участков")
+            self.imported_data = store
+            messagebox.showinfo("Успех", f"Успешно загружено {len(store)} участков")
             
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить файл:\n{str(e)}")
     
     def launch_calculator(self):
-        if self.system_type.get() == "cold":
-            calculator = ConsumerCalculator(tk.Toplevel(self.root))
-        else:
-            calculator = HotWaterCalculator(tk.Toplevel(self.root))
+        systems = self.SYSTEMS[self.system_type.get()]
+        calculator = SectionCalculator(tk.Toplevel(self.root), systems)
         
         # Если есть импортированные данные, передаем их в калькулятор
         if hasattr(self, 'imported_data'):
@@ -0,0 +1,296 @@
+#lookup.py
+
+import importlib
+import sys
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Union
+import numpy as np
+import tablecache
+import validation
+
+TEXT = {
+    "interpolation_error": "Не удалось выполнить интерполяцию.",
+    "table_error": "Таблица интерполяции должна содержать не менее двух возрастающих узлов.",
+    "column_length": "Столбец {} содержит {} значений вместо {} (по числу потребителей t_values).",
+    "duplicate_consumer": "Номер потребителя t={} встречается в t_values несколько раз.",
+    "t_not_found": "Значение t={} не найдено в массиве.",
+    "uncalculable": "Потребитель t={}: расход прибора q_{}_0 или q_{}_0_hr равен нулю, "
+                    "расчёт по вероятности действия приборов невозможен."
+}
+
+def linear_interpolation(x: float, x0: float, x1: float, y0: float, y1: float) -> float:
+    return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
+class InterpolationTable:
+    """Кусочно-линейная таблица y(x) с поиском отрезка бисекцией за O(log n)
+
+    Вне диапазона x значения экстраполируются по крайним отрезкам.
+    Узел x_k относится к отрезку [x_(k-1), x_k], как в прежнем линейном поиске,
+    поэтому результаты совпадают с ним бит в бит.
+    y_values может быть двумерным: тогда каждая строка - отдельная кривая
+    с общими узлами x (например, скорости для разных диаметров).
+    """
+    __slots__ = ('x_values', 'y_values', '_x_list', '_y_lists', '_last')
+
+    def __init__(self, x_values: np.ndarray, y_values: np.ndarray):
+        self.x_values = np.asarray(x_values, dtype=float)
+        self.y_values = np.asarray(y_values, dtype=float)
+        if len(self.x_values) < 2 or self.y_values.shape[-1] != len(self.x_values) \
+                or np.any(np.diff(self.x_values) <= 0):
+            raise ValueError(TEXT["table_error"])
+        # Списки Python для скалярного пути: без накладных расходов на скаляры NumPy
+        self._x_list = self.x_values.tolist()
+        self._y_lists = np.atleast_2d(self.y_values).tolist()
+        self._last = len(self._x_list) - 2
+
+    def segment(self, x: float) -> int:
+        """Номер отрезка [x_i, x_(i+1)], используемого для значения x"""
+        i = bisect_left(self._x_list, x) - 1
+        if i < 0:
+            return 0
+        return min(i, self._last)
+
+    def scalar(self, x: float, row: int = 0) -> float:
+        if x != x:  # NaN
+            raise ValueError(TEXT["interpolation_error"])
+        i = self.segment(x)
+        xs, ys = self._x_list, self._y_lists[row]
+        return linear_interpolation(x, xs[i], xs[i + 1], ys[i], ys[i + 1])
+
+    def array(self, x: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        if not np.all(np.isfinite(x)):
+            raise ValueError(TEXT["interpolation_error"])
+        i = np.clip(np.searchsorted(self.x_values, x, side='left') - 1, 0, self._last)
+        x_values = self.x_values
+        if rows is None:
+            y0, y1 = self.y_values[..., i], self.y_values[..., i + 1]
+        else:
+            y0, y1 = self.y_values[rows, i], self.y_values[rows, i + 1]
+        return linear_interpolation(x, x_values[i], x_values[i + 1], y0, y1)
+
+    def __call__(self, x: Union[float, np.ndarray], row: Optional[Union[int, np.ndarray]] = None):
+        if np.ndim(x) == 0 and np.ndim(row) == 0:
+            return self.scalar(float(x), 0 if row is None else int(row))
+        return self.array(x, row)
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+class AlphaCache:
+    """Ограниченный LRU-кэш значений alpha(P*N)
+
+    Одинаковые стояки и повторяющиеся этажи дают одни и те же P*N,
+    поэтому повторная интерполяция заменяется поиском в словаре.
+    maxsize=0 отключает кэширование.
+    """
+
+    def __init__(self, compute: Callable[[float], float], maxsize: int = 4096):
+        self._compute = compute
+        self._values = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __call__(self, x: float) -> float:
+        try:
+            value = self._values[x]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            self._values.move_to_end(x)
+            return value
+
+        self.misses += 1
+        value = self._compute(x)
+        if self.maxsize > 0:
+            self._values[x] = value
+            if len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def resize(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        while len(self._values) > max(maxsize, 0):
+            self._values.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Сбрасывает сохранённые значения (после перезагрузки таблиц data.py)"""
+        self._values.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, self.evictions, len(self._values), self.maxsize)
+
+# Поле записи потребителя -> массив в data.py
+CONSUMER_FIELDS = {
+    't': 't_values',
+    'q_tot_hru': 'q_tot_hru_values', 'q_h_hru': 'q_h_hru_values', 'q_c_hru': 'q_c_hru_values',
+    'q_tot': 'q_tot_values', 'q_h': 'q_h_values', 'q_c': 'q_c_values',
+    'q_tot_0': 'q_tot_0_values', 'q_h_0': 'q_h_0_values', 'q_c_0': 'q_c_0_values',
+    'q_tot_0_hr': 'q_tot_0_hr_values', 'q_h_0_hr': 'q_h_0_hr_values', 'q_c_0_hr': 'q_c_0_hr_values',
+    'group': 't_num_values',
+    'name': 't_string_values',
+}
+
+class ConsumerTable:
+    """Нормы потребителей из таблицы А.2 СП 30 одной структурированной таблицей
+
+    Каждая строка - запись потребителя со всеми нормами (q_hru, q_0, q_0_hr,
+    суточные q для общего, горячего и холодного потоков, группа, наименование).
+    Номер потребителя t находится по словарю за O(1). Таблица только для чтения;
+    длины всех столбцов проверяются при построении.
+    """
+    __slots__ = ('records', 'rows', 'sorted_t', 'sorted_rows', 'uncalculable')
+
+    def __init__(self, records: np.ndarray):
+        self.records = records
+        self.records.flags.writeable = False
+
+        self.rows = {}
+        for row, t in enumerate(self.records['t'].tolist()):
+            if t in self.rows:
+                raise ValueError(TEXT["duplicate_consumer"].format(t))
+            self.rows[t] = row
+        # Для поиска массива номеров бисекцией
+        self.sorted_rows = np.argsort(self.records['t'], kind='stable')
+        self.sorted_t = self.records['t'][self.sorted_rows]
+
+        # Поток -> маска потребителей без расхода прибора (полив, бассейны, катки):
+        # P*N = q_hru*U/q_0 для них не определена
+        self.uncalculable = {}
+        for stream in ('tot', 'h', 'c'):
+            fields = (f'q_{stream}_0', f'q_{stream}_0_hr')
+            if all(field in self.records.dtype.names for field in fields):
+                self.uncalculable[stream] = (self.records[fields[0]] <= 0) | (self.records[fields[1]] <= 0)
+
+    @staticmethod
+    def compile(columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Структурированный массив записей из столбцов равной длины"""
+        columns = {name: np.asarray(values) for name, values in columns.items()}
+        size = len(columns['t'])
+        for name, values in columns.items():
+            if len(values) != size:
+                raise ValueError(TEXT["column_length"].format(CONSUMER_FIELDS.get(name, name), len(values), size))
+
+        dtype = [(name, values.dtype if values.dtype.kind == 'U' else float) for name, values in columns.items()]
+        records = np.empty(size, dtype=dtype)
+        for name, values in columns.items():
+            records[name] = values
+        return records
+
+    @classmethod
+    def from_data(cls, module=None) -> 'ConsumerTable':
+        module = module or importlib.import_module("data")
+        return cls(cls.compile({name: getattr(module, array) for name, array in CONSUMER_FIELDS.items()}))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, t: float) -> bool:
+        return t in self.rows
+
+    def row(self, t: float) -> int:
+        """Номер строки потребителя t"""
+        try:
+            return self.rows[t]
+        except (KeyError, TypeError):
+            raise ValueError(TEXT["t_not_found"].format(t)) from None
+
+    def record(self, t: float) -> np.void:
+        """Все нормы потребителя t одной записью: record['q_c_hru'], record['name']..."""
+        return self.records[self.row(t)]
+
+    def find_rows(self, t: np.ndarray) -> np.ndarray:
+        """Номера строк для массива номеров потребителей"""
+        t = np.asarray(t)
+        pos = np.clip(np.searchsorted(self.sorted_t, t), 0, len(self.sorted_t) - 1)
+        missing = self.sorted_t[pos] != t
+        if np.any(missing):
+            raise ValueError(TEXT["t_not_found"].format(t[missing][0]))
+        return self.sorted_rows[pos]
+
+    def column(self, name: str) -> np.ndarray:
+        return self.records[name]
+
+    def check_calculable(self, rows: Union[int, np.ndarray], stream: str) -> None:
+        """Отклоняет потребителей, для которых поток stream нельзя рассчитать"""
+        rows = np.atleast_1d(rows)
+        bad = self.uncalculable[stream][rows]
+        if np.any(bad):
+            raise ValueError(TEXT["uncalculable"].format(self.records['t'][rows[bad][0]], stream, stream))
+
+@dataclass
+class TableLoad:
+    """Откуда и за сколько загружены таблицы при последнем построении"""
+    source: str  # 'cache' - двоичный кэш, 'data.py' - сборка из исходных массивов
+    seconds: float
+
+# Массивы, из которых строятся таблицы
+TABLE_ARRAYS = ('consumers', 'x_values', 'y_values', 'q_values', 'velocities', 'diam_values')
+
+def compile_arrays() -> Dict[str, np.ndarray]:
+    """Проверяет data.py и собирает из него все массивы таблиц (они же сохраняются в кэш)"""
+    data = importlib.import_module("data")
+    # Ошибки в data.py обнаруживаются при запуске, а не посреди расчёта
+    validation.validate(data)
+    return {
+        'consumers': ConsumerTable.from_data(data).records,
+        'x_values': np.asarray(data.x_values, dtype=float),
+        'y_values': np.asarray(data.y_values, dtype=float),
+        'q_values': np.asarray(data.q_values, dtype=float),
+        # Строка i соответствует диаметру diam_values[i]
+        'velocities': np.vstack([data.v_dict[D] for D in data.diam_values]).astype(float),
+        'diam_values': np.asarray(data.diam_values),
+    }
+
+def _build_tables(use_cache: bool = True) -> None:
+    global ALPHA_TABLE, VELOCITY_TABLE, DIAMETERS, DIAMETER_ROWS, CONSUMERS, LOAD_INFO
+    start = time.perf_counter()
+    arrays = tablecache.load(TABLE_ARRAYS) if use_cache else None
+    source = 'cache'
+    if arrays is None:
+        arrays = compile_arrays()
+        tablecache.save(arrays)
+        source = 'data.py'
+
+    # Нормы потребителей по номеру t
+    CONSUMERS = ConsumerTable(arrays['consumers'])
+    # Альфа по таблице Б.1 СП 30 в зависимости от P*N
+    ALPHA_TABLE = InterpolationTable(arrays['x_values'], arrays['y_values'])
+    # Скорости по расходу: строка i соответствует диаметру DIAMETERS[i]
+    VELOCITY_TABLE = InterpolationTable(arrays['q_values'], arrays['velocities'])
+    DIAMETERS = arrays['diam_values']
+    # Диаметр -> строка VELOCITY_TABLE
+    DIAMETER_ROWS = {int(D): row for row, D in enumerate(DIAMETERS)}
+    LOAD_INFO = TableLoad(source, time.perf_counter() - start)
+
+_build_tables()
+
+ALPHA_CACHE = AlphaCache(lambda x: ALPHA_TABLE.scalar(x))
+
+def reload_tables() -> None:
+    """Перечитывает data.py, перестраивает таблицы и кэш, сбрасывает кэш alpha"""
+    if "data" in sys.modules:
+        importlib.reload(sys.modules["data"])
+    _build_tables(use_cache=False)
+    ALPHA_CACHE.invalidate()
@@ -1,10 +1,20 @@
 # main.py
 
-import tkinter as tk
-from interface import MainApplication
+import sys
+
+def run_gui() -> None:
+    # tkinter и окна загружаются только для графического режима
+    import tkinter as tk
+    from interface import MainApplication
 
-if __name__ == "__main__":
     root = tk.Tk()
     app = MainApplication(root)
     root.eval('tk::PlaceWindow . center')
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # С аргументами - пакетный расчёт без графического интерфейса (см. cli.py)
+        import cli
+        sys.exit(cli.main())
+    run_gui()
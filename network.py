@@ -0,0 +1,384 @@
+#network.py
+
+"""Модель сети трубопроводов: дерево участков с подключёнными потребителями
+
+Участок i ведёт от узла вышестоящего участка parent[i] к своему узлу i;
+участки ввода имеют parent = ROOT. К узлу участка подключаются потребители
+(тип t и число приборов U). Число приборов и вероятности действия P*N
+накапливаются от концевых участков к вводу за один проход в обратном
+топологическом порядке: уровни дерева обходятся от самого глубокого,
+и каждый уровень добавляется к вышестоящим участкам одним векторным
+сложением. Затем расход и скорость каждого участка считаются по формулам
+СП 30 так же, как в engine.
+
+Сеть запоминает последний расчёт. После изменения подключений
+пересчитываются только изменённые участки и их путь к вводу, после
+изменения диаметра - только сам участок; массивы результатов
+обновляются на месте (см. calculate и updated).
+
+Если на участок приходятся потребители одного типа, он считается
+engine.calculate_streams_batch по суммарному U, и результат совпадает с
+ручным вводом этого U бит в бит. Для участков со смешанными потребителями
+P*N - сумма P_i*N_i, а q_0 - средневзвешенный по P_i*N_i расход прибора
+(если P*N = 0, например у потребителей без горячей воды, - средневзвешенный
+по U, как и у участка с одним типом потребителя).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+import engine
+import lookup
+from engine import SectionBatch
+from sections import DEFAULT_D
+
+TEXT = {
+    "section_not_found": "Участок {} не существует",
+    "parent_not_found": "Участок {}: вышестоящий участок {} не существует",
+    "cycle": "Участки {} не связаны с вводом (замкнутый контур): сеть должна быть деревом",
+    "lengths": "Массивы участков и подключений должны быть одной длины",
+    "attachment_not_found": "Подключение {} не существует"
+}
+
+# Вышестоящий участок для участков ввода
+ROOT = -1
+
+RESULT_COLUMNS = ('q_hru', 'q_0', 'PcN', 'alpha', 'Q', 'velocity')
+
+@dataclass
+class Accumulation:
+    """Суммы по всем участкам ниже данного (включая его собственные подключения)"""
+    U: np.ndarray        # число приборов
+    PN: np.ndarray       # (поток x участок): сумма P_i*N_i
+    PNq: np.ndarray      # (поток x участок): сумма P_i*N_i*q_0i
+    Uq: np.ndarray       # (поток x участок): сумма U_i*q_0i
+    consumer: np.ndarray # номер потребителя в таблице норм, если он один на участке, иначе -1
+
+@dataclass
+class _Sums:
+    """Строки sums: U, затем P*N, P*N*q_0 и U*q_0 по каждому потоку; lowest/highest - номера потребителей"""
+    sums: np.ndarray
+    lowest: np.ndarray
+    highest: np.ndarray
+
+@dataclass
+class _Solution:
+    """Последний расчёт сети: собственные и накопленные суммы и массивы результатов"""
+    systems: Tuple[str, ...]
+    own: _Sums
+    total: _Sums
+    D: np.ndarray
+    t: np.ndarray
+    index: np.ndarray
+    columns: Dict[str, np.ndarray]
+    batches: Dict[str, SectionBatch]
+
+class PipeNetwork:
+    """Дерево участков сети с потребителями, подключёнными к узлам участков"""
+
+    def __init__(self):
+        self._parent: List[int] = []
+        self._D: List[int] = []
+        self._attach_section: List[int] = []
+        self._attach_t: List[float] = []
+        self._attach_U: List[float] = []
+        self._levels: Optional[List[np.ndarray]] = None
+        self._solution: Optional[_Solution] = None
+        self._dirty_paths: Set[int] = set()     # изменились подключения: пересчёт пути к вводу
+        self._dirty_sections: Set[int] = set()  # изменился диаметр: пересчёт только участка
+        # Участки, пересчитанные последним вызовом calculate
+        self.updated = np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_arrays(cls, parent: Iterable[int], D: Iterable[int], attach_section: Iterable[int] = (),
+                    attach_t: Iterable[float] = (), attach_U: Iterable[float] = ()) -> 'PipeNetwork':
+        """Сеть из массивов: вышестоящий участок и диаметр каждого участка, подключения (участок, t, U)"""
+        network = cls()
+        network._parent = [int(p) for p in parent]
+        network._D = [int(d) for d in D]
+        network._attach_section = [int(s) for s in attach_section]
+        network._attach_t = [float(t) for t in attach_t]
+        network._attach_U = [float(U) for U in attach_U]
+        if len(network._parent) != len(network._D) or \
+                not len(network._attach_section) == len(network._attach_t) == len(network._attach_U):
+            raise ValueError(TEXT["lengths"])
+        for section, parent_section in enumerate(network._parent):
+            if parent_section != ROOT and not 0 <= parent_section < len(network._parent):
+                raise ValueError(TEXT["parent_not_found"].format(section, parent_section))
+        for section in network._attach_section:
+            network._check(section)
+        return network
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def _check(self, section: int) -> None:
+        if not 0 <= section < len(self._parent):
+            raise ValueError(TEXT["section_not_found"].format(section))
+
+    def add_section(self, parent: Optional[int] = None, D: int = DEFAULT_D) -> int:
+        """Добавляет участок после участка parent (None - участок ввода); возвращает его номер"""
+        if parent is None:
+            parent = ROOT
+        else:
+            self._check(parent)
+        self._parent.append(parent)
+        self._D.append(int(D))
+        # Изменилась структура дерева: следующий расчёт - полный
+        self._levels = None
+        self._solution = None
+        return len(self._parent) - 1
+
+    def attach(self, section: int, t: float, U: float) -> int:
+        """Подключает к узлу участка U приборов потребителя типа t; возвращает номер подключения"""
+        self._check(section)
+        self._attach_section.append(section)
+        self._attach_t.append(float(t))
+        self._attach_U.append(float(U))
+        self._dirty_paths.add(section)
+        return len(self._attach_section) - 1
+
+    def set_attachment(self, attachment: int, t: Optional[float] = None, U: Optional[float] = None) -> None:
+        """Меняет тип потребителя и/или число приборов подключения"""
+        if not 0 <= attachment < len(self._attach_section):
+            raise ValueError(TEXT["attachment_not_found"].format(attachment))
+        if t is not None:
+            self._attach_t[attachment] = float(t)
+        if U is not None:
+            self._attach_U[attachment] = float(U)
+        self._dirty_paths.add(self._attach_section[attachment])
+
+    def set_diameter(self, section: int, D: int) -> None:
+        self._check(section)
+        self._D[section] = int(D)
+        self._dirty_sections.add(section)
+
+    @property
+    def parent(self) -> np.ndarray:
+        return np.array(self._parent, dtype=np.int64)
+
+    @property
+    def D(self) -> np.ndarray:
+        return np.array(self._D, dtype=np.int64)
+
+    def levels(self) -> List[np.ndarray]:
+        """Участки по уровням: [участки ввода, их дочерние участки, ...]"""
+        if self._levels is not None:
+            return self._levels
+
+        parent = self._parent_array = self.parent
+        size = len(parent)
+        # Дочерние участки, сгруппированные по вышестоящему: участки ввода (ROOT) идут первыми
+        order = np.argsort(parent, kind='stable')
+        roots = int(np.count_nonzero(parent == ROOT))
+        self._children = order[roots:]
+        self._child_counts = np.bincount(parent[parent != ROOT], minlength=size)
+        self._child_starts = np.concatenate(([0], np.cumsum(self._child_counts)[:-1]))
+        self._depth = np.full(size, -1, dtype=np.int64)
+
+        levels = []
+        frontier = order[:roots]
+        while len(frontier):
+            self._depth[frontier] = len(levels)
+            levels.append(frontier)
+            frontier = self._children_of(frontier)
+
+        if np.any(self._depth < 0):
+            raise ValueError(TEXT["cycle"].format(np.flatnonzero(self._depth < 0)[:10].tolist()))
+        self._levels = levels
+        return levels
+
+    def _children_of(self, sections: np.ndarray) -> np.ndarray:
+        """Дочерние участки sections: по порядку sections, у каждого - по возрастанию номера"""
+        counts = self._child_counts[sections]
+        total = int(counts.sum())
+        if not total:
+            return np.empty(0, dtype=np.int64)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self._children[np.repeat(self._child_starts[sections], counts) + offsets]
+
+    def _own_sums(self, streams: List[str], sections: Optional[np.ndarray] = None) -> _Sums:
+        """Суммы по подключениям каждого участка (только участков sections, если они заданы)"""
+        size = len(self)
+        attached = np.array(self._attach_section, dtype=np.int64)
+        U_attached = np.array(self._attach_U, dtype=float)
+        t_attached = np.array(self._attach_t, dtype=float)
+        if sections is not None:
+            selected = np.isin(attached, sections)
+            attached, U_attached, t_attached = attached[selected], U_attached[selected], t_attached[selected]
+
+        # Нормы выбираются один раз на тип потребителя, затем раздаются подключениям
+        types, group = np.unique(t_attached, return_inverse=True)
+        type_rows = engine.find_consumers(types)
+        for stream in streams:
+            lookup.CONSUMERS.check_calculable(type_rows, stream)
+        rows = type_rows[group]
+        consumers = lookup.CONSUMERS.records[type_rows]
+
+        sums = np.zeros((1 + 3 * len(streams), size))
+        sums[0] = np.bincount(attached, weights=U_attached, minlength=size)
+        for k, stream in enumerate(streams):
+            q_0 = consumers[f"q_{stream}_0"][group]
+            PN = (consumers[f"q_{stream}_hru"][group] * U_attached) / (3600 * q_0)
+            sums[1 + k] = np.bincount(attached, weights=PN, minlength=size)
+            sums[1 + len(streams) + k] = np.bincount(attached, weights=PN * q_0, minlength=size)
+            sums[1 + 2 * len(streams) + k] = np.bincount(attached, weights=U_attached * q_0, minlength=size)
+
+        # Один ли тип потребителя ниже участка: сравниваются наименьший и наибольший номер
+        lowest = np.full(size, len(lookup.CONSUMERS), dtype=np.int64)
+        highest = np.full(size, -1, dtype=np.int64)
+        np.minimum.at(lowest, attached, rows)
+        np.maximum.at(highest, attached, rows)
+        return _Sums(sums, lowest, highest)
+
+    def _add_children(self, total: _Sums, children: np.ndarray) -> None:
+        """Добавляет суммы участков children к их вышестоящим участкам"""
+        upstream = self._parent_array[children]
+        np.add.at(total.sums, (slice(None), upstream), total.sums[:, children])
+        np.minimum.at(total.lowest, upstream, total.lowest[children])
+        np.maximum.at(total.highest, upstream, total.highest[children])
+
+    @staticmethod
+    def _accumulation(total: _Sums, streams: int) -> Accumulation:
+        sums = total.sums
+        return Accumulation(
+            U=sums[0], PN=sums[1:1 + streams], PNq=sums[1 + streams:1 + 2 * streams],
+            Uq=sums[1 + 2 * streams:],
+            consumer=np.where(total.lowest == total.highest, total.highest, -1)
+        )
+
+    def _total_sums(self, streams: List[str]) -> Tuple[_Sums, _Sums]:
+        """Собственные и накопленные суммы всех участков: один проход от концевых участков к вводу"""
+        levels = self.levels()
+        own = self._own_sums(streams)
+        total = _Sums(own.sums.copy(), own.lowest.copy(), own.highest.copy())
+        for level in reversed(levels[1:]):
+            self._add_children(total, level)
+        return own, total
+
+    def accumulate(self, systems: Iterable[str] = ("cold",)) -> Accumulation:
+        """Суммарные U, P*N и P*N*q_0 каждого участка по всем подключениям ниже него"""
+        streams = [engine.stream_of(system) for system in systems]
+        return self._accumulation(self._total_sums(streams)[1], len(streams))
+
+    def _solve(self, solution: _Solution, sections: np.ndarray) -> None:
+        """Пересчитывает расход и скорость участков sections в массивах solution"""
+        systems = list(solution.systems)
+        accumulation = self._accumulation(solution.total, len(systems))
+        U, D, columns = accumulation.U, solution.D, solution.columns
+        consumer = accumulation.consumer[sections]
+
+        solution.index[sections] = consumer
+        solution.t[sections] = np.nan
+        for values in columns.values():
+            values[:, sections] = 0.0
+
+        single = sections[consumer >= 0]
+        if len(single):
+            solution.t[single] = lookup.CONSUMERS.column('t')[accumulation.consumer[single]]
+            batches = engine.calculate_streams_batch(U[single], D[single], solution.t[single], systems)
+            for k, system in enumerate(systems):
+                batch = batches[system]
+                for name in RESULT_COLUMNS:
+                    columns[name][k, single] = getattr(batch, name)
+
+        mixed = sections[(consumer < 0) & (U[sections] > 0)]
+        if len(mixed):
+            PN = accumulation.PN[:, mixed]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # При P*N = 0 (поток не потребляется ни одним из потребителей) взвешивание по P*N
+                # невозможно - берётся средневзвешенный по U расход прибора
+                q_0 = np.where(PN > 0, accumulation.PNq[:, mixed] / PN, accumulation.Uq[:, mixed] / U[mixed])
+            try:
+                alpha = engine.interpolate_alpha_array(PN)
+                Q = 5 * q_0 * alpha
+                velocity = engine.interpolate_velocity_array(Q, D[mixed])
+            except ValueError as e:
+                raise ValueError(engine.TEXT["section_error"].format(str(e)))
+            columns['q_hru'][:, mixed] = PN * 3600 * q_0 / U[mixed]  # норма, при которой P*N = q_hru*U/(3600*q_0)
+            columns['q_0'][:, mixed] = q_0
+            columns['PcN'][:, mixed] = PN
+            columns['alpha'][:, mixed] = alpha
+            columns['Q'][:, mixed] = Q
+            columns['velocity'][:, mixed] = velocity
+
+    def _solve_all(self, systems: Tuple[str, ...]) -> None:
+        streams = [engine.stream_of(system) for system in systems]
+        size = len(self)
+        own, total = self._total_sums(streams)
+
+        t = np.full(size, np.nan)
+        index = np.full(size, -1, dtype=np.int64)
+        D = self.D
+        columns = {name: np.zeros((len(systems), size)) for name in RESULT_COLUMNS}
+        batches = {
+            system: SectionBatch(t=t, U=total.sums[0], D=D, index=index,
+                                 **{name: values[k] for name, values in columns.items()})
+            for k, system in enumerate(systems)
+        }
+        solution = _Solution(systems, own, total, D, t, index, columns, batches)
+        self._solve(solution, np.arange(size))
+        self._solution = solution
+        self.updated = np.arange(size)
+
+    def _affected(self) -> np.ndarray:
+        """Изменённые участки вместе с путями от них к вводу"""
+        parent = self._parent
+        affected = set()
+        for section in self._dirty_paths:
+            while section != ROOT and section not in affected:
+                affected.add(section)
+                section = parent[section]
+        return np.array(sorted(affected), dtype=np.int64)
+
+    def _solve_dirty(self) -> None:
+        solution = self._solution
+        streams = [engine.stream_of(system) for system in solution.systems]
+        paths = self._affected()
+
+        if len(paths):
+            dirty = np.array(sorted(self._dirty_paths), dtype=np.int64)
+            changed = self._own_sums(streams, dirty)
+            own, total = solution.own, solution.total
+            own.sums[:, dirty] = changed.sums[:, dirty]
+            own.lowest[dirty] = changed.lowest[dirty]
+            own.highest[dirty] = changed.highest[dirty]
+
+            # Участки пути пересобираются от самых глубоких: собственные суммы плюс суммы
+            # всех дочерних участков в том же порядке, что и при полном расчёте
+            depth = self._depth[paths]
+            for level in np.unique(depth)[::-1]:
+                sections = paths[depth == level]
+                total.sums[:, sections] = own.sums[:, sections]
+                total.lowest[sections] = own.lowest[sections]
+                total.highest[sections] = own.highest[sections]
+                self._add_children(total, self._children_of(sections))
+
+        diameters = np.array(sorted(self._dirty_sections), dtype=np.int64)
+        if len(diameters):
+            solution.D[diameters] = [self._D[section] for section in diameters.tolist()]
+
+        sections = np.union1d(paths, diameters)
+        self._solve(solution, sections)
+        self.updated = sections
+
+    def calculate(self, systems: Iterable[str] = ("cold",)) -> Dict[str, SectionBatch]:
+        """Расход и скорость всех участков сети для потоков systems
+
+        Участки без потребителей ниже них получают нулевые U, P*N, Q и скорость.
+        У участков со смешанными потребителями t = nan и index = -1.
+
+        Повторный вызов с теми же systems пересчитывает только изменённые
+        участки и их пути к вводу и возвращает те же объекты SectionBatch с
+        обновлёнными на месте массивами; номера пересчитанных участков - в updated.
+        """
+        systems = tuple(systems)
+        if self._solution is None or self._solution.systems != systems:
+            self._solve_all(systems)
+        elif self._dirty_paths or self._dirty_sections:
+            self._solve_dirty()
+        else:
+            self.updated = np.empty(0, dtype=np.int64)
+        self._dirty_paths.clear()
+        self._dirty_sections.clear()
+        return self._solution.batches
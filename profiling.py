@@ -0,0 +1,212 @@
+#profiling.py
+
+"""Таймеры и счётчики этапов расчёта, включаемые по требованию
+
+Этапы (импорт, проверка, поиск потребителей, интерполяция alpha и
+скоростей, расчёт нагрузок, сохранение) обёрнуты в PROFILER.stage(имя).
+Пока профилирование выключено, stage() возвращает общий пустой контекст,
+а timed_iter() - сам итератор, поэтому расходы сводятся к проверке флага.
+
+    profiling.PROFILER.enable(cprofile=True)
+    ... расчёт ...
+    print(profiling.PROFILER.summary())
+    profiling.PROFILER.dump("profile.json")
+
+Этапы могут быть вложенными: total - полное время этапа, self - без
+вложенных этапов. cProfile собирает данные только в потоке, где
+профилирование включено (фоновое сохранение в окне в него не попадает,
+но таймеры этапов его учитывают).
+"""
+
+import io
+import json
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+Item = TypeVar('Item')
+
+TEXT = {
+    "header": "{:<20} {:>8} {:>12} {:>12} {:>10}",
+    "columns": ("Этап", "Вызовов", "Всего, мс", "Собств., мс", "Доля"),
+    "row": "{:<20} {:>8} {:>12.3f} {:>12.3f} {:>9.1f}%",
+    "counter": "{:<20} {:>8}",
+    "counters": "Счётчики:",
+    "wall": "Время с включения профилирования: {:.3f} мс",
+    "empty": "Профилирование выключено или этапы не выполнялись",
+    "cprofile": "cProfile (по накопленному времени):",
+    "no_cprofile": "cProfile не был включён: нечего сохранять в {}"
+}
+
+# Сколько функций cProfile показывать в текстовой сводке
+CPROFILE_LINES = 25
+
+_DISABLED = nullcontext()
+
+class StageTimer:
+    """Накопленное время одного этапа"""
+    __slots__ = ('calls', 'total', 'self')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.self = 0.0
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'start', 'children')
+
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> '_Stage':
+        self.children = 0.0
+        self.profiler._stack().append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        elapsed = time.perf_counter() - self.start
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1].children += elapsed
+        self.profiler._record(self.name, elapsed, elapsed - self.children)
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.timers: Dict[str, StageTimer] = {}
+        self.counters: Dict[str, int] = {}
+        self.started: Optional[float] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._cprofile = None
+
+    def _stack(self) -> List[_Stage]:
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def _record(self, name: str, total: float, own: float) -> None:
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = StageTimer()
+            timer.calls += 1
+            timer.total += total
+            timer.self += own
+
+    def enable(self, cprofile: bool = False) -> None:
+        """Включает таймеры этапов (и cProfile для текущего потока), сбрасывая прежние данные"""
+        self.reset()
+        self.enabled = True
+        self.started = time.perf_counter()
+        if cprofile:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def disable(self) -> None:
+        """Выключает сбор данных; накопленные таймеры остаются доступны для сводки"""
+        self.enabled = False
+        if self._cprofile is not None:
+            self._cprofile.disable()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.timers = {}
+            self.counters = {}
+        self._cprofile = None
+        self.started = time.perf_counter() if self.enabled else None
+
+    def stage(self, name: str):
+        """Контекст замера этапа name"""
+        if not self.enabled:
+            return _DISABLED
+        return _Stage(self, name)
+
+    def count(self, name: str, value: int = 1) -> None:
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def timed_iter(self, name: str, items: Iterable[Item]) -> Iterable[Item]:
+        """Итератор, каждое получение элемента которого засчитывается в этап name
+
+        Подходит для ленивых конвейеров (чтение файла, проверка строк), где
+        работа выполняется не при вызове функции, а по мере перебора.
+        """
+        if not self.enabled:
+            return items
+        return self._timed_iter(name, iter(items))
+
+    def _timed_iter(self, name: str, items: Iterator[Item]) -> Iterator[Item]:
+        while True:
+            with _Stage(self, name):
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+            yield item
+
+    def report(self) -> Dict[str, Any]:
+        """Сводка в виде словаря для JSON: время этапов в секундах и счётчики"""
+        with self._lock:
+            stages = {
+                name: {"calls": timer.calls, "total": timer.total, "self": timer.self}
+                for name, timer in self.timers.items()
+            }
+            counters = dict(self.counters)
+        wall = time.perf_counter() - self.started if self.started is not None else None
+        return {"wall": wall, "stages": stages, "counters": counters}
+
+    def summary(self) -> str:
+        """Текстовая сводка: этапы по убыванию собственного времени, счётчики и cProfile"""
+        report = self.report()
+        if not report["stages"] and not report["counters"]:
+            return TEXT["empty"]
+
+        lines = []
+        if report["wall"] is not None:
+            lines.append(TEXT["wall"].format(report["wall"] * 1000))
+        lines.append(TEXT["header"].format(*TEXT["columns"]))
+        measured = sum(stage["self"] for stage in report["stages"].values()) or 1.0
+        for name, stage in sorted(report["stages"].items(), key=lambda item: -item[1]["self"]):
+            lines.append(TEXT["row"].format(
+                name, stage["calls"], stage["total"] * 1000, stage["self"] * 1000,
+                stage["self"] / measured * 100
+            ))
+        if report["counters"]:
+            lines.append(TEXT["counters"])
+            for name, value in sorted(report["counters"].items()):
+                lines.append(TEXT["counter"].format(name, value))
+
+        if self._cprofile is not None:
+            import pstats
+            stream = io.StringIO()
+            pstats.Stats(self._cprofile, stream=stream).sort_stats('cumulative').print_stats(CPROFILE_LINES)
+            if self.enabled:
+                # pstats останавливает профилировщик при сборе статистики
+                self._cprofile.enable()
+            lines.append(TEXT["cprofile"])
+            lines.append(stream.getvalue())
+        return "\n".join(lines)
+
+    def dump(self, file_path: str) -> None:
+        """Сохраняет сводку: .json - словарь report(), .prof - данные cProfile, иначе - текст summary()"""
+        if file_path.endswith('.prof'):
+            if self._cprofile is None:
+                raise ValueError(TEXT["no_cprofile"].format(file_path))
+            self._cprofile.dump_stats(file_path)
+            return
+        with open(file_path, 'w', encoding='utf-8') as f:
+            if file_path.endswith('.json'):
+                json.dump(self.report(), f, ensure_ascii=False, indent=2)
+            else:
+                f.write(self.summary())
+
+PROFILER = Profiler()
@@ -0,0 +1,232 @@
+#sections.py
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import lookup
+
+# Столбцы участка: t - тип потребителя (nan - общий тип расчёта),
+# U - число приборов (nan - не задано), D - диаметр
+COLUMNS = ('t', 'U', 'D')
+
+DEFAULT_D = int(lookup.DIAMETERS[0])
+
+# Нет соседа в списке
+NONE = -1
+
+class SectionStore:
+    """Хранилище участков: столбцы NumPy t, U, D и упорядоченный список строк
+
+    Строки лежат в ячейках (slot) массивов и не перемещаются. Порядок участков
+    задаётся массивом ячеек order и обратным ему массивом positions (ячейка ->
+    позиция). Добавление в конец - O(1), position() - O(1). Вставка в
+    середину и удаление - O(n): хвост обоих массивов сдвигается одной
+    векторной операцией NumPy (около 1 мс на 200 тыс. участков), зато
+    rows(), columns() и ids() всегда читают готовый порядок без перестройки.
+    Каждый участок получает постоянный номер (row_id), по которому его
+    находит редактор; номер не переиспользуется.
+
+    Добавленные и изменённые участки отмечаются; take_changed() отдаёт их
+    номера для пересчёта только этих участков (см. incremental.py).
+    """
+
+    def __init__(self, capacity: int = 16):
+        self._t = np.full(capacity, math.nan)
+        self._U = np.full(capacity, math.nan)
+        self._D = np.full(capacity, DEFAULT_D, dtype=np.int64)
+        self._ids = np.full(capacity, NONE, dtype=np.int64)
+        self._changed = np.zeros(capacity, dtype=bool)
+        self._order = np.full(capacity, NONE, dtype=np.int64)      # первые len(self) - ячейки по порядку
+        self._positions = np.full(capacity, NONE, dtype=np.int64)  # ячейка -> позиция в списке
+        self._slots: Dict[int, int] = {}  # row_id -> ячейка
+        self._free: List[int] = []        # освобождённые ячейки
+        self._used = 0                    # ячеек когда-либо занято
+        self._next_id = 0
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Tuple[np.ndarray, np.ndarray, np.ndarray]]) -> 'SectionStore':
+        """Хранилище из порций (t, U, D), например importer.iter_section_chunks"""
+        store = cls()
+        for t, U, D in chunks:
+            store.extend(t, U, D)
+        return store
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, row_id: int) -> bool:
+        return row_id in self._slots
+
+    def _capacity(self) -> int:
+        return len(self._ids)
+
+    def _reserve(self, size: int) -> None:
+        capacity = self._capacity()
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        extra = capacity - self._capacity()
+        self._t = np.concatenate([self._t, np.full(extra, math.nan)])
+        self._U = np.concatenate([self._U, np.full(extra, math.nan)])
+        self._D = np.concatenate([self._D, np.full(extra, DEFAULT_D, dtype=np.int64)])
+        self._ids = np.concatenate([self._ids, np.full(extra, NONE, dtype=np.int64)])
+        self._changed = np.concatenate([self._changed, np.zeros(extra, dtype=bool)])
+        self._order = np.concatenate([self._order, np.full(extra, NONE, dtype=np.int64)])
+        self._positions = np.concatenate([self._positions, np.full(extra, NONE, dtype=np.int64)])
+
+    def _slot(self, row_id: int) -> int:
+        try:
+            return self._slots[row_id]
+        except KeyError:
+            raise ValueError(f"Участок {row_id} не найден") from None
+
+    def _allocate(self, t: float, U: float, D: int) -> Tuple[int, int]:
+        if self._free:
+            slot = self._free.pop()
+        else:
+            self._reserve(self._used + 1)
+            slot = self._used
+            self._used += 1
+        row_id = self._next_id
+        self._next_id += 1
+        self._t[slot], self._U[slot], self._D[slot] = t, U, D
+        self._ids[slot] = row_id
+        self._changed[slot] = True
+        self._slots[row_id] = slot
+        return row_id, slot
+
+    def _link_at(self, slot: int, position: int) -> None:
+        """Ставит ячейку slot на позицию position, сдвигая следующие участки"""
+        count = len(self._slots) - 1  # участков до вставки (slot уже учтён в _slots)
+        order = self._order
+        if position < count:
+            order[position + 1:count + 1] = order[position:count]
+            self._positions[order[position + 1:count + 1]] += 1
+        order[position] = slot
+        self._positions[slot] = position
+
+    def append(self, t: float = math.nan, U: float = math.nan, D: int = DEFAULT_D) -> int:
+        row_id, slot = self._allocate(t, U, D)
+        self._link_at(slot, len(self._slots) - 1)
+        return row_id
+
+    def insert_after(self, row_id: Optional[int], t: float = math.nan, U: float = math.nan,
+                     D: int = DEFAULT_D) -> int:
+        """Добавляет участок после row_id (None - в начало списка)"""
+        position = 0 if row_id is None else int(self._positions[self._slot(row_id)]) + 1
+        new_id, slot = self._allocate(t, U, D)
+        self._link_at(slot, position)
+        return new_id
+
+    def delete(self, row_id: int) -> None:
+        slot = self._slot(row_id)
+        count = len(self._slots)
+        position = int(self._positions[slot])
+        order = self._order
+        order[position:count - 1] = order[position + 1:count]
+        self._positions[order[position:count - 1]] -= 1
+        order[count - 1] = NONE
+        self._positions[slot] = NONE
+        del self._slots[row_id]
+        self._ids[slot] = NONE
+        self._free.append(slot)
+
+    def get(self, row_id: int) -> Tuple[float, float, int]:
+        slot = self._slot(row_id)
+        return float(self._t[slot]), float(self._U[slot]), int(self._D[slot])
+
+    def set(self, row_id: int, column: str, value: Any) -> None:
+        if column not in COLUMNS:
+            raise ValueError(f"Неизвестный столбец: {column}")
+        slot = self._slot(row_id)
+        getattr(self, '_' + column)[slot] = value
+        self._changed[slot] = True
+
+    def set_column(self, column: str, values: np.ndarray) -> None:
+        """Задаёт столбец всем участкам в порядке списка; отмечаются только изменившиеся"""
+        if column not in COLUMNS:
+            raise ValueError(f"Неизвестный столбец: {column}")
+        slots = self._ordered()
+        data = getattr(self, '_' + column)
+        old = data[slots]
+        values = np.asarray(values, dtype=data.dtype)
+        changed = old != values
+        if data.dtype.kind == 'f':
+            changed &= ~(np.isnan(old) & np.isnan(values))
+        data[slots] = values
+        self._changed[slots[changed]] = True
+
+    def clear(self) -> None:
+        next_id = self._next_id
+        self.__init__(self._capacity())
+        self._next_id = next_id
+
+    def extend(self, t: np.ndarray, U: np.ndarray, D: np.ndarray) -> None:
+        """Добавляет участки в конец списка целыми столбцами"""
+        count = len(t)
+        if not count:
+            return
+        self._reserve(self._used + count)
+        slots = np.arange(self._used, self._used + count)
+        ids = np.arange(self._next_id, self._next_id + count)
+        self._t[slots], self._U[slots], self._D[slots] = t, U, D
+        self._ids[slots] = ids
+        self._changed[slots] = True
+        # Добавление в конец не сдвигает прежние участки
+        start = len(self._slots)
+        self._order[start:start + count] = slots
+        self._positions[slots] = np.arange(start, start + count)
+        self._slots.update(zip(ids.tolist(), slots.tolist()))
+        self._used += count
+        self._next_id += count
+
+    def replace_columns(self, t: np.ndarray, U: np.ndarray, D: np.ndarray) -> None:
+        """Заменяет все участки столбцами t, U, D"""
+        self.clear()
+        self.extend(t, U, D)
+
+    def replace(self, sections: Iterable[Dict[str, Any]]) -> None:
+        """Заменяет все участки записями {'t', 'U', 'D'}"""
+        sections = list(sections)
+        self.replace_columns(
+            np.array([item.get('t', math.nan) for item in sections], dtype=float),
+            np.array([item.get('U', math.nan) for item in sections], dtype=float),
+            np.array([item.get('D', DEFAULT_D) for item in sections], dtype=np.int64)
+        )
+
+    def _ordered(self) -> np.ndarray:
+        """Ячейки в порядке участков"""
+        return self._order[:len(self._slots)]
+
+    def position(self, row_id: int) -> int:
+        return int(self._positions[self._slot(row_id)])
+
+    def rows(self, start: int, stop: int) -> List[Tuple[int, float, float, int]]:
+        """Участки с позициями start..stop-1: (row_id, t, U, D)"""
+        slots = self._ordered()[max(start, 0):stop]
+        return list(zip(
+            self._ids[slots].tolist(), self._t[slots].tolist(),
+            self._U[slots].tolist(), self._D[slots].tolist()
+        ))
+
+    def columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Копии столбцов t, U, D в порядке участков"""
+        slots = self._ordered()
+        return self._t[slots], self._U[slots], self._D[slots]
+
+    def ids(self) -> np.ndarray:
+        """Номера участков (row_id) в порядке списка"""
+        return self._ids[self._ordered()]
+
+    def take_changed(self) -> np.ndarray:
+        """Номера участков, добавленных или изменённых после прошлого вызова; отметки снимаются"""
+        used = slice(0, self._used)
+        slots = np.flatnonzero(self._changed[used] & (self._ids[used] != NONE))
+        self._changed[:] = False
+        return self._ids[slots]
+
+    def get_columns(self, row_ids: Iterable[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Столбцы t, U, D участков row_ids"""
+        slots = np.array([self._slot(row_id) for row_id in row_ids], dtype=np.int64)
+        return self._t[slots], self._U[slots], self._D[slots]
@@ -0,0 +1,87 @@
+#tablecache.py
+
+"""Двоичный кэш скомпилированных справочных таблиц
+
+Таблицы, построенные из data.py (нормы потребителей, узлы alpha и скоростей),
+сохраняются в __pycache__/data_tables рядом с data.py: по файлу .npy на
+массив и manifest.json с версией формата и хэшем исходных текстов data.py,
+lookup.py (сборка массивов) и validation.py (проверка таблиц).
+При следующих запусках массивы открываются через memory map без импорта
+и проверки data.py. Если любой из этих файлов изменился, кэш не
+используется и перестраивается.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, Iterable, Optional
+import numpy as np
+
+# Увеличивается при изменении набора или формата сохраняемых массивов
+CACHE_VERSION = 1
+
+MANIFEST = "manifest.json"
+
+# Модули, от текста которых зависят сохранённые массивы
+SOURCE_MODULES = ("data", "lookup", "validation")
+
+def source_path(module: str = "data") -> str:
+    """Путь к исходному файлу модуля без его импорта"""
+    return importlib.util.find_spec(module).origin
+
+def cache_dir() -> str:
+    return os.path.join(os.path.dirname(source_path()), "__pycache__", "data_tables")
+
+def source_hash() -> str:
+    digest = hashlib.sha256(f"{CACHE_VERSION}:{np.__version__}:".encode())
+    for module in SOURCE_MODULES:
+        with open(source_path(module), 'rb') as f:
+            source = f.read()
+        # Длина перед текстом: границы между файлами не сдвигаются
+        digest.update(f"{module}:{len(source)}:".encode())
+        digest.update(source)
+    return digest.hexdigest()
+
+def load(names: Iterable[str], directory: Optional[str] = None) -> Optional[Dict[str, np.ndarray]]:
+    """Массивы из кэша (только для чтения) или None, если кэша нет или он устарел"""
+    directory = directory or cache_dir()
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("version") != CACHE_VERSION or manifest.get("hash") != source_hash():
+            return None
+        return {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r') for name in names}
+    except (OSError, ValueError, KeyError):
+        return None
+
+def save(arrays: Dict[str, np.ndarray], directory: Optional[str] = None) -> bool:
+    """Сохраняет массивы в кэш; возвращает False, если каталог недоступен для записи
+
+    Файлы пишутся во временный каталог, который затем подменяет прежний кэш,
+    поэтому параллельно запущенные процессы не увидят недописанный кэш.
+    """
+    directory = directory or cache_dir()
+    parent = os.path.dirname(directory)
+    try:
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix="data_tables.", dir=parent)
+    except OSError:
+        return False
+
+    try:
+        for name, values in arrays.items():
+            np.save(os.path.join(staging, f"{name}.npy"), np.asarray(values), allow_pickle=False)
+        with open(os.path.join(staging, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump({"version": CACHE_VERSION, "hash": source_hash(), "arrays": sorted(arrays)}, f)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(staging, directory)
+        return True
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        return False
+
+def clear(directory: Optional[str] = None) -> None:
+    shutil.rmtree(directory or cache_dir(), ignore_errors=True)
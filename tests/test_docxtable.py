@@ -0,0 +1,36 @@
+#test_docxtable.py
+
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+docx = pytest.importorskip("docx")
+
+import docxtable
+
+HEADERS = ["t", "U", "D"]
+
+def _rows(count):
+    return [[str(i), str(i * 2), "20"] for i in range(count)]
+
+@pytest.mark.parametrize("count, rows_per_table, sizes", [
+    (6, 3, [3, 3]),        # число строк кратно rows_per_table: без пустой таблицы в конце
+    (7, 3, [3, 3, 1]),     # остаток - в последней таблице
+    (2, 3, [2]),
+    (0, 3, [0]),
+])
+def test_split_tables(count, rows_per_table, sizes):
+    doc = docx.Document()
+    tables = docxtable.add_table(doc, HEADERS, _rows(count), rows_per_table=rows_per_table)
+    # В каждой таблице - строка заголовка и строки данных
+    assert [len(table.rows) - 1 for table in tables] == sizes
+    assert len(doc.tables) == len(sizes)
+    values = [row.cells[0].text for table in tables for row in table.rows[1:]]
+    assert values == [str(i) for i in range(count)]
+
+def test_without_split():
+    doc = docx.Document()
+    tables = docxtable.add_table(doc, HEADERS, _rows(2500))
+    assert len(tables) == 1 and len(tables[0].rows) == 2501
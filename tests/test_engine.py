@@ -0,0 +1,69 @@
+#test_engine.py
+
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine
+import lookup
+
+# От одного прибора до значений P*N за пределами таблицы alpha
+U_VALUES = [1.0, 2.0, 7.5, 40.0, 250.0, 1000.0, 5000.0]
+
+def _scalar(t, U, D, system):
+    _, params = engine.get_consumer_params(t, system)
+    return engine.calculate_section(t, U, D, *params)
+
+@pytest.mark.parametrize("system", list(engine.SYSTEMS))
+def test_batch_matches_scalar_for_every_consumer(system):
+    """Пакетный расчёт совпадает с поучастковым бит в бит для всех потребителей таблицы"""
+    stream = engine.stream_of(system)
+    consumers = lookup.CONSUMERS.column('t')
+    calculable = ~lookup.CONSUMERS.uncalculable[stream]
+    assert calculable.any() and not calculable.all()
+
+    for t, ok in zip(consumers.tolist(), calculable.tolist()):
+        if not ok:
+            # Потребители без q_0 (q_0_hr) отклоняются обоими путями
+            with pytest.raises(ValueError):
+                engine.calculate_sections_batch([10.0], [20], [t], system)
+            with pytest.raises(ValueError):
+                engine.get_consumer_params(t, system)
+            continue
+        U = np.repeat(U_VALUES, len(lookup.DIAMETERS))
+        D = np.tile(lookup.DIAMETERS, len(U_VALUES))
+        batch = engine.calculate_sections_batch(U, D, np.full(len(U), t), system).to_results()
+        scalar = [_scalar(t, u, int(d), system) for u, d in zip(U.tolist(), D.tolist())]
+        assert batch == scalar
+
+def test_mixed_consumers_in_one_batch():
+    t = lookup.CONSUMERS.column('t')
+    t = t[~lookup.CONSUMERS.uncalculable["c"]]
+    batch = engine.calculate_streams_batch(np.full(len(t), 25.0), 25, t, ("cold",))["cold"].to_results()
+    assert batch == [_scalar(float(x), 25.0, 25, "cold") for x in t]
+
+def test_t_range_edges():
+    t = np.sort(lookup.CONSUMERS.column('t'))
+    first, last = float(t[0]), float(t[-1])
+    for value in (first, last):
+        if not lookup.CONSUMERS.uncalculable["c"][lookup.CONSUMERS.row(value)]:
+            assert engine.calculate_sections_batch([10.0], [20], [value]).to_results() == [_scalar(value, 10.0, 20, "cold")]
+    # За пределами таблицы номер потребителя не найден ни одним путём
+    for value in (first - 1, last + 1, first + 0.5):
+        with pytest.raises(ValueError):
+            engine.calculate_sections_batch([10.0], [20], [value])
+        with pytest.raises(ValueError):
+            engine.get_consumer_params(value)
+
+def test_consumers_without_stream_norm():
+    """Потребители с q_hru = 0 (например, без горячей воды): P*N = 0, расход - по alpha(0)"""
+    records = lookup.CONSUMERS.records
+    rows = np.flatnonzero((records['q_h_hru'] == 0) & ~lookup.CONSUMERS.uncalculable["h"])
+    assert len(rows)
+    t = records['t'][rows]
+    batch = engine.calculate_sections_batch(np.full(len(t), 10.0), 20, t, "hot")
+    assert np.all(batch.PcN == 0) and np.all(np.isfinite(batch.velocity))
+    assert batch.to_results() == [_scalar(float(x), 10.0, 20, "hot") for x in t]
@@ -0,0 +1,62 @@
+#test_incremental.py
+
+import math
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import engine
+from incremental import IncrementalCalculation
+from sections import SectionStore
+
+SYSTEMS = ("cold", "hot", "total")
+
+def _full(store, t_default):
+    t, U, D = store.columns()
+    t[np.isnan(t)] = t_default
+    return {system: batch.to_results()
+            for system, batch in engine.calculate_streams_batch(U, D, t, SYSTEMS).items()}
+
+def test_matches_full_calculation():
+    """После любых правок, вставок, удалений и invalidate() результаты равны полному расчёту"""
+    rng = np.random.default_rng(3)
+    store = SectionStore()
+    store.extend(rng.choice([5.0, 12.0, np.nan], 300), rng.uniform(1, 300, 300), rng.choice([20, 25, 32, 40], 300))
+    calculation = IncrementalCalculation(store, SYSTEMS)
+    t_default = 5.0
+    for step in range(300):
+        ids = store.ids()
+        operation = rng.integers(0, 7)
+        if operation == 0:
+            store.set(int(rng.choice(ids)), 'U', float(rng.uniform(1, 300)))
+        elif operation == 1:
+            store.set(int(rng.choice(ids)), 'D', int(rng.choice([20, 25, 32])))
+        elif operation == 2:
+            store.set(int(rng.choice(ids)), 't', float(rng.choice([5.0, 30.0, np.nan])))
+        elif operation == 3:
+            store.insert_after(int(rng.choice(ids)), 12.0, float(rng.uniform(1, 50)), 25)
+        elif operation == 4 and len(store) > 10:
+            store.delete(int(rng.choice(ids)))
+        elif operation == 5:
+            t_default = float(rng.choice([5.0, 12.0, 30.0]))
+        else:
+            calculation.invalidate()
+        updated = calculation.update(t_default)
+        assert calculation.result_lists() == _full(store, t_default), step
+        assert len(updated) <= len(store)
+
+def test_error_keeps_pending_rows():
+    store = SectionStore()
+    store.extend(np.full(5, 5.0), np.full(5, 10.0), np.full(5, 20))
+    calculation = IncrementalCalculation(store)
+    calculation.update()
+    row_id = int(store.ids()[2])
+    store.set(row_id, 'U', math.nan)
+    with pytest.raises(ValueError, match="№3"):
+        calculation.update()
+    store.set(row_id, 'U', 40.0)
+    assert calculation.update() == [row_id]
+    assert calculation.result_lists() == {"cold": _full(store, None)["cold"]}
@@ -0,0 +1,80 @@
+#test_lookup.py
+
+import math
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lookup import AlphaCache, InterpolationTable
+
+X = [0.0, 1.0, 3.0]
+Y = [[0.0, 2.0, 4.0], [10.0, 8.0, 2.0]]
+
+@pytest.fixture
+def table():
+    return InterpolationTable(X, Y)
+
+def test_nodes_and_inner_points(table):
+    for row in range(2):
+        for x, y in zip(X, Y[row]):
+            assert table.scalar(x, row) == y
+        assert table.scalar(0.5, row) == (Y[row][0] + Y[row][1]) / 2
+    assert table.scalar(2.0) == 3.0
+
+def test_outside_range_extrapolates_by_edge_segments(table):
+    # Слева - по первому отрезку, справа - по последнему
+    assert table.scalar(-1.0) == -2.0
+    assert table.scalar(5.0) == 6.0
+    assert table.scalar(-1.0, 1) == 12.0
+    assert table.scalar(5.0, 1) == -4.0
+
+def test_array_matches_scalar(table):
+    x = np.array([-1.0, 0.0, 0.25, 1.0, 1.0 + 1e-12, 2.9, 3.0, 7.0])
+    rows = np.array([0, 1, 0, 1, 0, 1, 0, 1])
+    assert table.array(x, rows).tolist() == [table.scalar(v, r) for v, r in zip(x.tolist(), rows.tolist())]
+    # Без rows - все кривые сразу (строка - кривая)
+    all_rows = table.array(x)
+    assert all_rows.shape == (2, len(x))
+    assert all_rows[1].tolist() == [table.scalar(v, 1) for v in x.tolist()]
+
+def test_invalid_input(table):
+    with pytest.raises(ValueError):
+        table.scalar(math.nan)
+    with pytest.raises(ValueError):
+        table.array(np.array([1.0, np.inf]))
+    with pytest.raises(ValueError):
+        InterpolationTable([0.0, 0.0, 1.0], [1.0, 2.0, 3.0])
+    with pytest.raises(ValueError):
+        InterpolationTable([0.0], [1.0])
+
+def test_cache_hits_and_lru_eviction():
+    calls = []
+    cache = AlphaCache(lambda x: calls.append(x) or x * 2, maxsize=2)
+    assert cache(1.0) == 2.0 and cache(2.0) == 4.0
+    assert cache(1.0) == 2.0           # попадание: 1.0 становится самым свежим
+    assert cache(3.0) == 6.0           # вытесняется давно не использованное 2.0
+    assert cache(1.0) == 2.0
+    assert cache(2.0) == 4.0           # 2.0 вычисляется заново
+    assert calls == [1.0, 2.0, 3.0, 2.0]
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (2, 4, 2, 2)
+
+def test_cache_resize_and_disable():
+    calls = []
+    cache = AlphaCache(lambda x: calls.append(x) or x, maxsize=3)
+    for x in (1.0, 2.0, 3.0):
+        cache(x)
+    cache.resize(1)
+    assert cache.stats().size == 1 and cache.stats().evictions == 2
+    cache(3.0)
+    assert calls == [1.0, 2.0, 3.0]
+    cache.resize(0)
+    cache(5.0)
+    cache(5.0)
+    assert calls[-2:] == [5.0, 5.0] and cache.stats().size == 0
+    cache.invalidate()
+    cache.reset_stats()
+    assert cache.stats().hits == cache.stats().misses == 0
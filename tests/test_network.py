@@ -0,0 +1,57 @@
+#test_network.py
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network import ROOT, PipeNetwork
+
+def test_mixed_consumers_without_stream():
+    """Смешанные потребители без горячей воды (P*N = 0) не ломают расчёт ГВС"""
+    network = PipeNetwork.from_arrays([-1, 0, 0], [32, 20, 20], [1, 2], [1.0, 2.0], [10.0, 10.0])
+    batches = network.calculate(("cold", "hot"))
+    assert np.all(np.isfinite(batches["cold"].velocity))
+    batch = batches["hot"]
+    assert np.all(np.isfinite(batch.Q)) and np.all(np.isfinite(batch.velocity))
+    assert batch.PcN[0] == 0.0
+    # q_0 стояка - средневзвешенный по U расход прибора двух квартир
+    assert np.isclose(batch.q_0[0], (batch.q_0[1] * 10 + batch.q_0[2] * 10) / 20)
+
+def _fresh(network, systems):
+    return PipeNetwork.from_arrays(
+        network._parent, network._D, network._attach_section, network._attach_t, network._attach_U
+    ).calculate(systems)
+
+def test_dirty_update_matches_full_solve():
+    """Пересчёт изменённых участков и их путей к вводу (_solve_dirty) равен полному расчёту (_solve)"""
+    rng = np.random.default_rng(7)
+    size = 400
+    parent = [ROOT] + [int(rng.integers(0, i)) for i in range(1, size)]
+    attached = 600
+    network = PipeNetwork.from_arrays(
+        parent, rng.choice([20, 25, 32, 40, 50, 63, 75, 90, 110], size),
+        rng.integers(0, size, attached), rng.choice([5.0, 12.0, 30.0], attached), rng.uniform(1, 20, attached)
+    )
+    systems = ("cold", "hot", "total")
+    batches = network.calculate(systems)
+    for step in range(100):
+        kind = rng.integers(0, 3)
+        if kind == 0:
+            network.set_attachment(int(rng.integers(0, attached)), U=float(rng.uniform(1, 30)),
+                                   t=float(rng.choice([1.0, 5.0, 12.0, 30.0])))
+        elif kind == 1:
+            network.set_diameter(int(rng.integers(0, size)), int(rng.choice([20, 25, 32, 40, 50])))
+        else:
+            network.attach(int(rng.integers(0, size)), float(rng.choice([5.0, 12.0])), float(rng.uniform(1, 5)))
+            attached += 1
+        again = network.calculate(systems)
+        # Результаты обновляются на месте и пересчитываются не все участки
+        assert again is batches
+        assert len(network.updated) < size
+        fresh = _fresh(network, systems)
+        for system in systems:
+            for name in ('t', 'U', 'D', 'index', 'q_hru', 'q_0', 'PcN', 'alpha', 'Q', 'velocity'):
+                assert np.array_equal(getattr(again[system], name), getattr(fresh[system], name), equal_nan=True), \
+                    (step, system, name)
@@ -0,0 +1,103 @@
+#validation.py
+
+"""Проверка согласованности справочных таблиц data.py при запуске
+
+Таблицы проверяются один раз при построении lookup-таблиц (и при их
+перезагрузке), до любого расчёта. Структурные ошибки (разная длина
+параллельных массивов, неупорядоченные узлы интерполяции, несуществующие
+имена в __all__) прерывают запуск. Потребители без расхода прибора q_0
+или q_0_hr (полив, бассейны, катки) ошибкой таблицы не являются: они
+отмечаются как нерасчётные по вероятности действия приборов, и такие
+участки отклоняются в начале расчёта.
+"""
+
+from types import ModuleType
+from typing import List
+import numpy as np
+
+TEXT = {
+    "errors": "Ошибки в справочных таблицах data.py:\n{}",
+    "length": "{}: {} значений вместо {} (по длине {})",
+    "missing": "{}: массив отсутствует",
+    "increasing": "{}: значения должны строго возрастать (нарушено на позиции {})",
+    "finite": "{}: содержит NaN или бесконечность",
+    "negative": "{}: отрицательная норма у потребителя t={}",
+    "duplicate": "t_values: номер потребителя t={} повторяется",
+    "export": "__all__: имя {} не определено в data.py",
+    "velocity_keys": "v_dict: диаметры {} не совпадают с diam_values {}"
+}
+
+# Параллельные массивы норм потребителей: длина каждого равна длине t_values
+CONSUMER_ARRAYS = [
+    'q_tot_hru_values', 'q_h_hru_values', 'q_c_hru_values',
+    'q_tot_values', 'q_h_values', 'q_c_values',
+    'q_tot_0_values', 'q_h_0_values', 'q_c_0_values',
+    'q_tot_0_hr_values', 'q_h_0_hr_values', 'q_c_0_hr_values',
+    't_num_values', 't_string_values'
+]
+
+# Массивы, по которым ведётся поиск бисекцией
+SORTED_ARRAYS = ['x_values', 'q_values', 'diam_values']
+
+def _first_not_increasing(values: np.ndarray) -> int:
+    steps = np.flatnonzero(np.diff(values) <= 0)
+    return int(steps[0]) + 1 if len(steps) else -1
+
+def check_lengths(module: ModuleType) -> List[str]:
+    errors = []
+    size = len(module.t_values)
+    for name in CONSUMER_ARRAYS:
+        values = getattr(module, name, None)
+        if values is None:
+            errors.append(TEXT["missing"].format(name))
+        elif len(values) != size:
+            errors.append(TEXT["length"].format(name, len(values), size, 't_values'))
+
+    if len(module.y_values) != len(module.x_values):
+        errors.append(TEXT["length"].format('y_values', len(module.y_values), len(module.x_values), 'x_values'))
+    for D, velocities in module.v_dict.items():
+        if len(velocities) != len(module.q_values):
+            errors.append(TEXT["length"].format(f'v_dict[{D}]', len(velocities), len(module.q_values), 'q_values'))
+    return errors
+
+def check_sorted(module: ModuleType) -> List[str]:
+    errors = []
+    for name in SORTED_ARRAYS:
+        values = np.asarray(getattr(module, name), dtype=float)
+        if not np.all(np.isfinite(values)):
+            errors.append(TEXT["finite"].format(name))
+            continue
+        position = _first_not_increasing(values)
+        if position >= 0:
+            errors.append(TEXT["increasing"].format(name, position))
+
+    if sorted(int(D) for D in module.v_dict) != [int(D) for D in module.diam_values]:
+        errors.append(TEXT["velocity_keys"].format(sorted(module.v_dict), list(module.diam_values)))
+    return errors
+
+def check_consumers(module: ModuleType) -> List[str]:
+    errors = []
+    t_values = np.asarray(module.t_values)
+    unique, counts = np.unique(t_values, return_counts=True)
+    for t in unique[counts > 1]:
+        errors.append(TEXT["duplicate"].format(t))
+
+    for name in CONSUMER_ARRAYS[:12]:
+        values = np.asarray(getattr(module, name, []), dtype=float)
+        if len(values) != len(t_values):
+            continue  # уже учтено в check_lengths
+        if not np.all(np.isfinite(values)):
+            errors.append(TEXT["finite"].format(name))
+        negative = np.flatnonzero(values < 0)
+        if len(negative):
+            errors.append(TEXT["negative"].format(name, t_values[negative[0]]))
+    return errors
+
+def check_exports(module: ModuleType) -> List[str]:
+    return [TEXT["export"].format(name) for name in getattr(module, '__all__', []) if not hasattr(module, name)]
+
+def validate(module: ModuleType) -> None:
+    """Проверяет таблицы модуля data; при ошибках выбрасывает ValueError со списком всех ошибок"""
+    errors = check_lengths(module) + check_sorted(module) + check_consumers(module) + check_exports(module)
+    if errors:
+        raise ValueError(TEXT["errors"].format("\n".join(errors)))
@@ -0,0 +1,184 @@
+#xlsxstream.py
+
+"""Потоковая запись таблицы в XLSX без построения книги в памяти
+
+Строки листа по мере поступления пишутся в XML во временный файл, ширина
+столбцов обновляется на каждой строке. При закрытии XLSX-архив собирается
+из минимального набора частей (книга, один лист, стили), а строки
+копируются в него из временного файла. Память не зависит от числа строк.
+"""
+
+import tempfile
+import zipfile
+from typing import Any, Iterable, List, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name={} sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+)
+
+COPY_CHUNK = 1 << 20
+
+NOT_FINITE = ('nan', 'inf', '-inf')
+
+def column_letter(index: int) -> str:
+    """Буквенное имя столбца по номеру с нуля: 0 -> A, 26 -> AA"""
+    letters = ""
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(ord('A') + rest) + letters
+    return letters
+
+def column_width(length: int) -> float:
+    """Ширина столбца по длине самого длинного значения (как прежний автоподбор)"""
+    return (length + 2) * 1.2
+
+class XlsxStreamWriter:
+    """Книга XLSX из одного листа, записываемая построчно
+
+    with XlsxStreamWriter(path, "Лист") as writer:
+        writer.append(["t", "U"])
+        writer.append([5, 100.0])
+
+    Если внутри with возникло исключение (например, отмена сохранения),
+    файл не создаётся.
+    """
+
+    def __init__(self, file_path: str, title: str, auto_width: bool = True):
+        self.file_path = file_path
+        self.title = title
+        self.auto_width = auto_width
+        self.widths: List[int] = []
+        self.row_count = 0
+        self._letters: List[str] = []
+        self._rows = tempfile.TemporaryFile()
+
+    def __enter__(self) -> 'XlsxStreamWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _cell(self, reference: str, value: Any) -> Tuple[str, int]:
+        if not isinstance(value, (str, bool)):
+            try:
+                # Числа записываются так же, как в openpyxl: 16 значащих цифр, NaN - пустая ячейка
+                text = "%.16g" % value
+            except TypeError:
+                pass
+            else:
+                if text in NOT_FINITE:
+                    return "", 0
+                return f'<c r="{reference}"><v>{text}</v></c>', len(text)
+        text = str(value)
+        return f'<c r="{reference}" t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>', len(text)
+
+    def append(self, values: Iterable[Any]) -> None:
+        self.row_count += 1
+        row = self.row_count
+        cells = []
+        for i, value in enumerate(values):
+            if i >= len(self._letters):
+                self._letters.append(column_letter(i))
+                self.widths.append(0)
+            if value is None:
+                continue
+            xml, length = self._cell(f"{self._letters[i]}{row}", value)
+            cells.append(xml)
+            if length > self.widths[i]:
+                self.widths[i] = length
+        self._rows.write(f'<row r="{row}">{"".join(cells)}</row>'.encode('utf-8'))
+
+    def _columns_xml(self) -> str:
+        if not self.auto_width or not self.widths:
+            return ""
+        columns = "".join(
+            f'<col min="{i + 1}" max="{i + 1}" width="{column_width(length)}" customWidth="1"/>'
+            for i, length in enumerate(self.widths)
+        )
+        return f"<cols>{columns}</cols>"
+
+    def abort(self) -> None:
+        """Прекращает запись без создания файла"""
+        self._rows.close()
+
+    def close(self) -> None:
+        try:
+            with zipfile.ZipFile(self.file_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr('[Content_Types].xml', CONTENT_TYPES)
+                archive.writestr('_rels/.rels', ROOT_RELS)
+                archive.writestr('xl/workbook.xml', WORKBOOK.format(quoteattr(self.title)))
+                archive.writestr('xl/_rels/workbook.xml.rels', WORKBOOK_RELS)
+                archive.writestr('xl/styles.xml', STYLES)
+                with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+                    sheet.write((SHEET_START + self._columns_xml() + '<sheetData>').encode('utf-8'))
+                    self._rows.seek(0)
+                    while True:
+                        chunk = self._rows.read(COPY_CHUNK)
+                        if not chunk:
+                            break
+                        sheet.write(chunk)
+                    sheet.write(b'</sheetData></worksheet>')
+        finally:
+            self._rows.close()